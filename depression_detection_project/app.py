@@ -1,422 +1,686 @@
-# app.py — Polished Mental Health & Wellness App (no deprecations, stable reruns)
-import os
-import time
-import random
-import datetime as dt
-
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import streamlit as st
-
-# -------------------------
-# CONFIG
-# -------------------------
-st.set_page_config(page_title="Wellness Companion", page_icon="🧠", layout="wide")
-
-DATA_DIR = "data"
-MOOD_CSV = os.path.join(DATA_DIR, "moods.csv")
-JOURNAL_CSV = os.path.join(DATA_DIR, "journal.csv")
-
-os.makedirs(DATA_DIR, exist_ok=True)
-if not os.path.exists(MOOD_CSV):
-    pd.DataFrame(columns=["date", "mood_score"]).to_csv(MOOD_CSV, index=False)
-if not os.path.exists(JOURNAL_CSV):
-    pd.DataFrame(columns=["timestamp", "title", "text"]).to_csv(JOURNAL_CSV, index=False)
-
-MOOD_LABELS = {"😊 Happy": 5, "🙂 Okay": 4, "😐 Neutral": 3, "☹️ Sad": 2, "😭 Very Low": 1}
-INV_MOOD = {v: k for k, v in MOOD_LABELS.items()}
-
-QUOTES = [
-    "This too shall pass 🌤️",
-    "You are stronger than you think 💪",
-    "Small steps every day lead to big changes 🌱",
-    "Keep going — one breath at a time 🌿",
-    "Your story is still being written ✨",
-]
-
-RESOURCES = [
-    ("India — KIRAN Helpline", "1800-599-0019"),
-    ("Vandrevala Foundation", "9152987821"),
-    ("Befrienders Worldwide", "https://www.befrienders.org/"),
-    ("WHO Mental Health", "https://www.who.int/health-topics/mental-health"),
-]
-
-# -------------------------
-# UTILS
-# -------------------------
-def load_moods() -> pd.DataFrame:
-    try:
-        df = pd.read_csv(MOOD_CSV)
-        if not {"date", "mood_score"}.issubset(df.columns):
-            return pd.DataFrame(columns=["date", "mood_score"])
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        df = df.dropna(subset=["date"])
-        return df.sort_values("date")
-    except Exception:
-        return pd.DataFrame(columns=["date", "mood_score"])
-
-
-def save_mood(date_str: str, score: int) -> None:
-    df = load_moods()
-    if not df.empty and "date" in df:
-        df = df[df["date"].dt.strftime("%Y-%m-%d") != date_str]
-    new_row = pd.DataFrame([{"date": pd.to_datetime(date_str), "mood_score": score}])
-    df = pd.concat([df, new_row], ignore_index=True).sort_values("date")
-    df.to_csv(MOOD_CSV, index=False)
-
-
-def load_journal() -> pd.DataFrame:
-    try:
-        return pd.read_csv(JOURNAL_CSV)
-    except Exception:
-        return pd.DataFrame(columns=["timestamp", "title", "text"])
-
-
-def save_journal(title: str, text: str) -> None:
-    ts = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    df = load_journal()
-    new_row = pd.DataFrame([{"timestamp": ts, "title": title, "text": text}])
-    df = pd.concat([df, new_row], ignore_index=True)
-    df.to_csv(JOURNAL_CSV, index=False)
-
-
-def dummy_risk_score(text: str) -> float:
-    """Keyword-based probability 0..100 (simple demo)."""
-    negatives = [
-        "sad",
-        "depressed",
-        "alone",
-        "hopeless",
-        "tired",
-        "anxious",
-        "worthless",
-        "suicide",
-        "cry",
-    ]
-    hits = sum(1 for w in negatives if w in text.lower())
-    base = min(90, hits * 20)  # each hit adds ~20 up to 90
-    jitter = random.uniform(-5, 5)
-    return max(0, min(100, round(base + jitter, 1)))
-
-
-def gauge_figure(percent: float) -> go.Figure:
-    fig = go.Figure(
-        go.Indicator(
-            mode="gauge+number",
-            value=percent,
-            title={"text": "Depression Risk (%)"},
-            gauge={
-                "axis": {"range": [0, 100]},
-                "bar": {
-                    "color": "crimson" if percent >= 60 else ("orange" if percent >= 35 else "green")
-                },
-                "steps": [
-                    {"range": [0, 35], "color": "#d4edda"},
-                    {"range": [35, 60], "color": "#fff3cd"},
-                    {"range": [60, 100], "color": "#f8d7da"},
-                ],
-            },
-        )
-    )
-    fig.update_layout(height=250, margin=dict(l=10, r=10, t=40, b=10))
-    return fig
-
-
-def mood_trend_figure(df: pd.DataFrame) -> go.Figure:
-    if df.empty:
-        return go.Figure()
-    fig = px.line(df, x="date", y="mood_score", markers=True, title="Mood Trend")
-    fig.update_layout(height=300, margin=dict(l=10, r=10, t=40, b=10), template="plotly_white", title_x=0.5)
-    fig.update_yaxes(range=[0.5, 5.5], dtick=1)
-    return fig
-
-
-def summary_text() -> str:
-    moods = load_moods()
-    journal = load_journal()
-    avg7 = moods.tail(7)["mood_score"].mean() if not moods.empty else float("nan")
-    avg30 = moods.tail(30)["mood_score"].mean() if not moods.empty else float("nan")
-
-    # streak
-    streak = 0
-    if not moods.empty:
-        dates = set(moods["date"].dt.date.tolist())
-        d = dt.date.today()
-        while d in dates:
-            streak += 1
-            d -= dt.timedelta(days=1)
-
-    lines = [
-        f"Report generated: {dt.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-        f"7-day avg mood (1-5): {avg7:.2f}" if pd.notna(avg7) else "7-day avg mood (1-5): —",
-        f"30-day avg mood (1-5): {avg30:.2f}" if pd.notna(avg30) else "30-day avg mood (1-5): —",
-        f"Current logging streak: {streak} day(s)",
-        f"Journal entries: {len(journal)}",
-    ]
-    return "\n".join(lines)
-
-
-st.markdown(
-    "<h1 style='text-align: center; color: white;'>🌐 Social Media Wellness Analyzer</h1>",
-    unsafe_allow_html=True
-)
-
-
-# -------------------------
-# SIDEBAR NAVIGATION
-# -------------------------
-with st.sidebar:
-    st.markdown("---")
-    st.title("Wellness Companion")
-    user_name = st.text_input("Display name", value=st.session_state.get("display_name", "Friend"))
-    st.session_state.display_name = user_name
-    page = st.radio("Navigate", ["Home", "Analyze", "Mood Tracker", "Journal", "Wellness", "Export"])
-
-st.sidebar.markdown("---")
-st.sidebar.markdown(
-    "If you are in crisis, contact local emergency services or a helpline immediately."
-)
-for label, link in RESOURCES:
-    if str(link).startswith("http"):
-        st.sidebar.markdown(f"- [{label}]({link})")
-    else:
-        st.sidebar.markdown(f"- **{label}:** {link}")
-
-# -------------------------
-# PAGE: HOME
-# -------------------------
-if page == "Home":
-    st.title(f"Welcome , {st.session_state.display_name} 🌿")
-    st.caption("A calm space for reflection — this is awareness & self-care, not a medical diagnosis.")
-
-    col1, col2 = st.columns([2, 1])
-    with col1:
-        st.subheader("⚡ Scan Your Thoughts")
-        quick_text = st.text_area(
-            "Paste a short post or your journal thought here (private):",
-            height=120,
-            placeholder="e.g. I haven't been sleeping well lately...",
-        )
-        if st.button("Scan", key="scan_quick"):
-            if not quick_text.strip():
-                st.warning("Please enter something to scan.")
-            else:
-                risk = dummy_risk_score(quick_text)
-                st.plotly_chart(gauge_figure(risk), use_container_width=True)
-                if risk >= 60:
-                    st.error(
-                        f"High risk detected — {risk}%. Consider reaching out to someone you trust or a professional."
-                    )
-                    st.info(random.choice(QUOTES))
-                elif risk >= 35:
-                    st.warning(f"Moderate indicators — {risk}%. Try a calming activity or journaling.")
-                else:
-                    st.success(f"Low indicators — {risk}%. Keep leaning into positive routines!")
-    with col2:
-        st.subheader("Today at a glance")
-        moods = load_moods()
-        avg7 = moods.tail(7)["mood_score"].mean() if not moods.empty else float("nan")
-        avg30 = moods.tail(30)["mood_score"].mean() if not moods.empty else float("nan")
-        # streak
-        streak = 0
-        if not moods.empty:
-            dates = set(moods["date"].dt.date.tolist())
-            d = dt.date.today()
-            while d in dates:
-                streak += 1
-                d -= dt.timedelta(days=1)
-        st.metric("7-day avg", f"{avg7:.2f}" if pd.notna(avg7) else "—")
-        st.metric("30-day avg", f"{avg30:.2f}" if pd.notna(avg30) else "—")
-        st.metric("Logging streak", f"{streak} day(s)")
-        st.markdown("### A small encouragement")
-        st.info(random.choice(QUOTES))
-
-# -------------------------
-# PAGE: ANALYZE (detailed)
-# -------------------------
-elif page == "Analyze":
-    st.title("Analyze a Post or Journal Entry")
-    text = st.text_area(
-        "Paste text to analyze (longer text gives a clearer signal):", height=180, placeholder="Write or paste here..."
-    )
-
-    # state holders for analysis results
-    if "analyze_score" not in st.session_state:
-        st.session_state.analyze_score = None
-        st.session_state.analyze_suggested = None
-
-    analyze_col1, analyze_col2 = st.columns([1, 1])
-    with analyze_col1:
-        if st.button("Analyze Text", key="analyze_text"):
-            if not text.strip():
-                st.warning("Please write or paste something to analyze.")
-            else:
-                score = dummy_risk_score(text)
-                st.session_state.analyze_score = score
-                st.session_state.analyze_suggested = "☹️ Sad" if score >= 60 else ("😐 Neutral" if score >= 35 else "😊 Happy")
-
-        # Show last results (if any)
-        if st.session_state.analyze_score is not None:
-            st.plotly_chart(gauge_figure(st.session_state.analyze_score), use_container_width=True)
-            st.write(f"**Suggested mood:** {st.session_state.analyze_suggested} ({st.session_state.analyze_score}%)")
-            if st.button("Save suggested mood", key="save_suggested"):
-                today = dt.date.today().strftime("%Y-%m-%d")
-                suggested = st.session_state.analyze_suggested
-                score_map = {"😊 Happy": 5, "😐 Neutral": 3, "☹️ Sad": 2}
-                save_mood(today, score_map.get(suggested, 3))
-                st.success("Suggested mood saved.")
-
-    with analyze_col2:
-        if st.button("Analyze & Save as Journal", key="analyze_save_journal"):
-            if not text.strip():
-                st.warning("Please write something first.")
-            else:
-                score = dummy_risk_score(text)
-                st.plotly_chart(gauge_figure(score), use_container_width=True)
-                save_journal("Quick Entry", text)
-                st.success("Saved as journal entry.")
-
-# -------------------------
-# PAGE: MOOD TRACKER
-# -------------------------
-elif page == "Mood Tracker":
-    st.title("Mood Tracker")
-    st.subheader("Log how you feel today")
-    selected = st.selectbox("Pick your mood for today", list(MOOD_LABELS.keys()), index=2)
-    if st.button("Save Mood", key="save_mood"):
-        today = dt.date.today().strftime("%Y-%m-%d")
-        save_mood(today, MOOD_LABELS[selected])
-        st.success("Mood saved ✅")
-
-    df = load_moods()
-    if df.empty:
-        st.info("No moods logged yet. Use the form above to add today's mood.")
-    else:
-        st.subheader("Mood Trend")
-        fig = mood_trend_figure(df)
-        st.plotly_chart(fig, use_container_width=True)
-        avg7 = df.tail(7)["mood_score"].mean() if not df.empty else float("nan")
-        st.markdown(f"**7-day average mood:** {avg7:.2f}" if pd.notna(avg7) else "**7-day average mood:** —")
-        if st.button("Clear mood history", key="clear_moods"):
-            pd.DataFrame(columns=["date", "mood_score"]).to_csv(MOOD_CSV, index=False)
-            st.success("Cleared mood history")
-
-# -------------------------
-# PAGE: JOURNAL
-# -------------------------
-elif page == "Journal":
-    st.title("Journal — Write & Reflect")
-    jtitle = st.text_input("Title (optional)")
-    jtext = st.text_area("Write about your day, thoughts, or paste a post to save:", height=200)
-    c1, c2 = st.columns(2)
-    with c1:
-        if st.button("Save Journal Entry", key="save_journal"):
-            if not jtext.strip():
-                st.warning("Write something before saving.")
-            else:
-                save_journal(jtitle if jtitle else "Untitled", jtext)
-                st.success("Journal saved.")
-    with c2:
-        if st.button("Analyze Journal Text", key="analyze_journal_text"):
-            if not jtext.strip():
-                st.warning("Write something to analyze.")
-            else:
-                score = dummy_risk_score(jtext)
-                st.plotly_chart(gauge_figure(score), use_container_width=True)
-                if score >= 60:
-                    st.warning("High likelihood of depressive language. Consider reaching out.")
-                elif score >= 35:
-                    st.info("Moderate indicators — self-care recommended.")
-                else:
-                    st.success("Low indicators.")
-
-    st.markdown("### Your Journal History")
-    jdf = load_journal()
-    if jdf.empty:
-        st.info("No journal entries yet.")
-    else:
-        view = jdf.sort_values("timestamp", ascending=False).reset_index(drop=True)
-        st.dataframe(view, use_container_width=True, height=250)
-        q = st.text_input("Search journal by keyword (optional)")
-        if q.strip():
-            filtered = view[
-                view["title"].str.contains(q, case=False, na=False)
-                | view["text"].str.contains(q, case=False, na=False)
-            ]
-            st.dataframe(filtered, use_container_width=True, height=250)
-
-# -------------------------
-# PAGE: WELLNESS
-# -------------------------
-elif page == "Wellness":
-    st.title("Wellness Tools")
-    st.subheader("Motivational Thought")
-    st.info(random.choice(QUOTES))
-    st.subheader("Quick Stress Tip")
-    st.success(
-        random.choice(
-            [
-                "Take a 3-minute breathing break (4-4-4).",
-                "Step outside and get 5 minutes of sunlight.",
-                "Write down one small win today.",
-            ]
-        )
-    )
-
-    st.markdown("#### 5-minute breathing coach")
-    if "breath_end" not in st.session_state:
-        st.session_state.breath_end = None
-        st.session_state.breath_running = False
-
-    minutes = st.slider("Minutes", 1, 10, 3)
-    cols = st.columns([1, 1, 1])
-    with cols[0]:
-        if st.button("Start", key="breath_start"):
-            st.session_state.breath_end = time.time() + minutes * 60
-            st.session_state.breath_running = True
-    with cols[1]:
-        if st.button("Stop", key="breath_stop"):
-            st.session_state.breath_running = False
-            st.session_state.breath_end = None
-    with cols[2]:
-        if st.button("Skip", key="breath_skip"):
-            st.session_state.breath_running = False
-            st.session_state.breath_end = None
-
-    if st.session_state.get("breath_running") and st.session_state.breath_end:
-        remaining = int(st.session_state.breath_end - time.time())
-        if remaining <= 0:
-            st.session_state.breath_running = False
-            st.session_state.breath_end = None
-            st.success("Breathing session complete 🎉")
-        else:
-            phase = (remaining // 4) % 2
-            st.info("Inhale..." if phase == 0 else "Exhale...")
-            st.markdown(f"**Time left:** {remaining}s")
-            # Smooth 1-second tick without deprecated APIs
-            time.sleep(1)
-            st.rerun()
-
-# -------------------------
-# PAGE: EXPORT
-# -------------------------
-elif page == "Export":
-    st.title("Export Data & Summary")
-    moods = load_moods()
-    journal = load_journal()
-
-    st.subheader("Download CSV")
-    st.download_button("Download moods.csv", moods.to_csv(index=False).encode("utf-8"), file_name="moods.csv")
-    st.download_button("Download journal.csv", journal.to_csv(index=False).encode("utf-8"), file_name="journal.csv")
-
-    st.subheader("Summary report (TXT)")
-    txt = summary_text()
-    st.text_area("Summary preview", txt, height=200)
-    st.download_button("Download summary.txt", txt.encode("utf-8"), file_name="summary.txt")
-
-# Footer
-st.markdown("---")
-st.caption(
-    "This app is an awareness & self-care tool only — not a medical device. If you are in crisis, contact local emergency services or a helpline immediately."
-)
+# app.py — Polished Mental Health & Wellness App (no deprecations, stable reruns)
+from __future__ import annotations
+
+import time
+
+# Cold-start clock: only a process's first run pays for the imports below
+script_started = time.perf_counter()
+
+import cProfile
+import hashlib
+import io
+import os
+import pstats
+import random
+import datetime as dt
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+import streamlit as st
+
+import metrics
+from model_service import loaded_handle
+from scoring_worker import ScoringWorker, get_scoring_worker
+import wellness_data
+from storage import DEFAULT_USER, StorePool, WellnessStore, get_store_pool
+from wellness_data import fmt_avg
+
+# pandas, plotly, charts, exports and the model are imported by the pages that use them
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    from model_service import ModelHandle
+
+metrics.record_startup("import", time.perf_counter() - script_started)
+
+# -------------------------
+# CONFIG
+# -------------------------
+st.set_page_config(page_title="Wellness Companion", page_icon="🧠", layout="wide")
+
+JOURNAL_PAGE_SIZE = 20
+PROFILE_DIR = "profiles"
+
+# Whole-rerun timing; the optional profiler (rerun_profile) is switched on from the sidebar
+rerun_started = time.perf_counter()
+
+MOOD_LABELS = {"😊 Happy": 5, "🙂 Okay": 4, "😐 Neutral": 3, "☹️ Sad": 2, "😭 Very Low": 1}
+INV_MOOD = {v: k for k, v in MOOD_LABELS.items()}
+
+QUOTES = [
+    "This too shall pass 🌤️",
+    "You are stronger than you think 💪",
+    "Small steps every day lead to big changes 🌱",
+    "Keep going — one breath at a time 🌿",
+    "Your story is still being written ✨",
+]
+
+RESOURCES = [
+    ("India — KIRAN Helpline", "1800-599-0019"),
+    ("Vandrevala Foundation", "9152987821"),
+    ("Befrienders Worldwide", "https://www.befrienders.org/"),
+    ("WHO Mental Health", "https://www.who.int/health-topics/mental-health"),
+]
+
+BREATHING_TIMER_HTML = """
+<div id="coach" style="font-family: sans-serif; padding: 0.75rem 1rem; border-radius: 0.5rem;
+     background: #e8f4fd; color: #0b5394;">
+  <div id="phase" style="font-size: 1.3rem; font-weight: 600;"></div>
+  <div id="left" style="margin-top: 0.25rem;"></div>
+</div>
+<script>
+  // Ticks run in the browser; the server renders this once, not once per second
+  const endAt = Date.now() + %(remaining_ms)d;
+  const phase = document.getElementById("phase"), left = document.getElementById("left");
+  function tick() {
+    const remaining = Math.ceil((endAt - Date.now()) / 1000);
+    if (remaining <= 0) {
+      phase.textContent = "Breathing session complete 🎉";
+      left.textContent = "";
+      document.getElementById("coach").style.background = "#d4edda";
+      return;
+    }
+    phase.textContent = Math.floor(remaining / 4) %% 2 === 0 ? "Inhale..." : "Exhale...";
+    left.innerHTML = "<b>Time left:</b> " + remaining + "s";
+    setTimeout(tick, ((endAt - Date.now()) %% 1000) || 1000);
+  }
+  tick();
+</script>
+"""
+
+# -------------------------
+# UTILS
+# -------------------------
+@st.cache_resource
+def store_pool() -> StorePool:
+    """Per-user stores, opened once per server process and shared by every session."""
+    return get_store_pool()
+
+
+def wellness_store() -> WellnessStore:
+    """The current display name's store (the default name also owns the legacy data)."""
+    return store_pool().for_name(st.session_state.get("display_name"))
+
+
+@metrics.timed("load_moods")
+def load_moods() -> pd.DataFrame:
+    store = wellness_store()
+    return store.cached("moods", lambda: wellness_data.load_moods(store))
+
+
+@metrics.timed("save_mood")
+def save_mood(date_str: str, score: int) -> None:
+    wellness_store().upsert_mood(date_str, score)
+
+
+@metrics.timed("load_journal_page")
+def load_journal_page(page: int) -> pd.DataFrame:
+    """One page of history, newest first; only ``JOURNAL_PAGE_SIZE`` rows leave SQLite."""
+    return wellness_data.load_journal_page(wellness_store(), page, JOURNAL_PAGE_SIZE)
+
+
+@metrics.timed("load_journal_risk")
+def load_journal_risk() -> pd.DataFrame:
+    store = wellness_store()
+    return store.cached("journal_risk", lambda: wellness_data.load_journal_risk(store))
+
+
+@metrics.timed("save_journal")
+def save_journal(title: str, text: str) -> None:
+    store = wellness_store()
+    store.add_journal(title, text)
+    # Scored in the background; the history shows the score once it lands
+    scoring_worker().submit(store)
+
+
+@st.cache_resource(show_spinner="Loading model...")
+def model_handle() -> ModelHandle:
+    """Loaded and warmed on first use, then shared by every session and rerun of the process."""
+    from model_service import get_model_handle
+
+    return get_model_handle()
+
+
+def current_model() -> ModelHandle:
+    """The model, picking up a retrained artifact without a restart."""
+    handle = model_handle()
+    if handle.reload_if_changed():
+        metrics.inc("model_reloads_total")
+    return handle
+
+
+@st.cache_resource
+def scoring_worker() -> ScoringWorker:
+    return get_scoring_worker(model_handle())
+
+
+def score_backlog(store: WellnessStore) -> None:
+    """Score entries saved before this model was deployed (once per user and model version)."""
+    current_model()
+    scoring_worker().ensure_scored(store)
+
+
+@metrics.timed("risk_score")
+def risk_score(text: str) -> float:
+    """Depression risk 0..100 from the trained model."""
+    return current_model().risk_score(text)
+
+
+@metrics.timed("gauge_figure")
+def gauge_figure(percent: float) -> go.Figure:
+    import plotly.graph_objects as go
+
+    fig = go.Figure(
+        go.Indicator(
+            mode="gauge+number",
+            value=percent,
+            title={"text": "Depression Risk (%)"},
+            gauge={
+                "axis": {"range": [0, 100]},
+                "bar": {
+                    "color": "crimson" if percent >= 60 else ("orange" if percent >= 35 else "green")
+                },
+                "steps": [
+                    {"range": [0, 35], "color": "#d4edda"},
+                    {"range": [35, 60], "color": "#fff3cd"},
+                    {"range": [60, 100], "color": "#f8d7da"},
+                ],
+            },
+        )
+    )
+    fig.update_layout(height=250, margin=dict(l=10, r=10, t=40, b=10))
+    return fig
+
+
+@metrics.timed("mood_trend_figure")
+def mood_trend_figure(zoom: str, resolution: str) -> tuple:
+    """Downsampled trend chart, rebuilt only when the user's data or the zoom/resolution changes."""
+    import charts
+
+    store = wellness_store()
+    return store.cached(
+        ("mood_trend", zoom, resolution), lambda: charts.mood_trend_figure(load_moods(), zoom, resolution)
+    )
+
+
+@metrics.timed("risk_trend_figure")
+def risk_trend_figure(df: pd.DataFrame) -> go.Figure:
+    import pandas as pd
+    import plotly.express as px
+
+    df = df.assign(timestamp=pd.to_datetime(df["timestamp"], errors="coerce")).sort_values("timestamp")
+    fig = px.line(df, x="timestamp", y="risk_score", markers=True, hover_data=["title"], title="Journal risk over time")
+    fig.update_layout(height=300, margin=dict(l=10, r=10, t=40, b=10), template="plotly_white", title_x=0.5)
+    fig.update_yaxes(range=[0, 100], title="risk (%)")
+    return fig
+
+
+@metrics.timed("period_average_figure")
+def period_average_figure(rows: list, kind: str) -> go.Figure:
+    import pandas as pd
+    import plotly.express as px
+
+    df = pd.DataFrame(rows, columns=[kind, "avg_mood", "days"])
+    fig = px.bar(df, x=kind, y="avg_mood", hover_data=["days"], title=f"Average mood by {kind}")
+    fig.update_layout(height=300, margin=dict(l=10, r=10, t=40, b=10), template="plotly_white", title_x=0.5)
+    fig.update_yaxes(range=[0, 5.5], dtick=1)
+    return fig
+
+
+def breathing_timer(remaining_s: float) -> None:
+    """Client-side countdown: no server sleeps or reruns while it runs."""
+    st.iframe(BREATHING_TIMER_HTML % {"remaining_ms": remaining_s * 1000}, height=90)
+
+
+@metrics.timed("summary_text")
+def summary_text() -> str:
+    store = wellness_store()
+    # Streaks and averages move with the date too; the timestamp is added fresh on every call
+    body = store.cached(f"summary:{dt.date.today()}", lambda: wellness_data.summary_body(store))
+    return wellness_data.summary_text(store, body)
+
+
+@metrics.timed("export_bundle")
+def export_bundle(store: WellnessStore) -> io.BytesIO:
+    """Built on click; Streamlit reads the buffer into bytes (it rejects spooled temp files)."""
+    import exports
+
+    return exports.bundle_buffer(store)
+
+
+@metrics.timed("mood_report_pdf")
+def mood_report_pdf(store: WellnessStore) -> bytes:
+    """Built once per data version and day; later clicks reuse the cached file."""
+    import exports
+
+    with open(exports.cached_pdf(store), "rb") as f:
+        return f.read()
+
+
+def finish_profile(profiler: cProfile.Profile, page: str) -> None:
+    """Keep the raw stats of this rerun's (stopped) profiler and show the top entries."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = page.lower().replace(" ", "_")
+    path = os.path.join(PROFILE_DIR, f"{dt.datetime.now():%Y%m%d-%H%M%S-%f}-{name}.prof")
+    profiler.dump_stats(path)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(25)
+    with st.sidebar.expander("Last rerun profile"):
+        st.caption(f"Saved to {path} (open with snakeviz or pstats)")
+        st.code(out.getvalue(), language=None)
+
+
+@contextmanager
+def rerun_profile() -> Iterator[None]:
+    """cProfile the block when "Profile reruns" is on; stopped and saved even if the block raises."""
+    if not st.session_state.get("profile_reruns"):
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        finish_profile(profiler, st.session_state.get("page", "Home"))
+
+
+# -------------------------
+# PAGE: HOME
+# -------------------------
+def home_page() -> None:
+    st.title(f"Welcome , {st.session_state.display_name} 🌿")
+    st.caption("A calm space for reflection — this is awareness & self-care, not a medical diagnosis.")
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        st.subheader("⚡ Scan Your Thoughts")
+        quick_text = st.text_area(
+            "Paste a short post or your journal thought here (private):",
+            height=120,
+            placeholder="e.g. I haven't been sleeping well lately...",
+        )
+        if st.button("Scan", key="scan_quick"):
+            if not quick_text.strip():
+                st.warning("Please enter something to scan.")
+            else:
+                risk = risk_score(quick_text)
+                st.plotly_chart(gauge_figure(risk), use_container_width=True)
+                if risk >= 60:
+                    st.error(
+                        f"High risk detected — {risk}%. Consider reaching out to someone you trust or a professional."
+                    )
+                    st.info(random.choice(QUOTES))
+                elif risk >= 35:
+                    st.warning(f"Moderate indicators — {risk}%. Try a calming activity or journaling.")
+                else:
+                    st.success(f"Low indicators — {risk}%. Keep leaning into positive routines!")
+    with col2:
+        st.subheader("Today at a glance")
+        stats = wellness_store().mood_summary()
+        st.metric("7-day avg", fmt_avg(stats["avg7"]))
+        st.metric("30-day avg", fmt_avg(stats["avg30"]))
+        st.metric("Logging streak", f"{stats['streak']} day(s)")
+        st.markdown("### A small encouragement")
+        st.info(random.choice(QUOTES))
+
+
+# -------------------------
+# PAGE: ANALYZE (detailed)
+# -------------------------
+def analyze_page() -> None:
+    st.title("Analyze a Post or Journal Entry")
+    text = st.text_area(
+        "Paste text to analyze (longer text gives a clearer signal):", height=180, placeholder="Write or paste here..."
+    )
+
+    # state holders for analysis results
+    if "analyze_score" not in st.session_state:
+        st.session_state.analyze_score = None
+        st.session_state.analyze_suggested = None
+
+    analyze_col1, analyze_col2 = st.columns([1, 1])
+    with analyze_col1:
+        if st.button("Analyze Text", key="analyze_text"):
+            if not text.strip():
+                st.warning("Please write or paste something to analyze.")
+            else:
+                score = risk_score(text)
+                st.session_state.analyze_score = score
+                st.session_state.analyze_suggested = "☹️ Sad" if score >= 60 else ("😐 Neutral" if score >= 35 else "😊 Happy")
+
+        # Show last results (if any)
+        if st.session_state.analyze_score is not None:
+            st.plotly_chart(gauge_figure(st.session_state.analyze_score), use_container_width=True)
+            st.write(f"**Suggested mood:** {st.session_state.analyze_suggested} ({st.session_state.analyze_score}%)")
+            if st.button("Save suggested mood", key="save_suggested"):
+                today = dt.date.today().strftime("%Y-%m-%d")
+                suggested = st.session_state.analyze_suggested
+                score_map = {"😊 Happy": 5, "😐 Neutral": 3, "☹️ Sad": 2}
+                save_mood(today, score_map.get(suggested, 3))
+                st.success("Suggested mood saved.")
+
+    with analyze_col2:
+        if st.button("Analyze & Save as Journal", key="analyze_save_journal"):
+            if not text.strip():
+                st.warning("Please write something first.")
+            else:
+                score = risk_score(text)
+                st.plotly_chart(gauge_figure(score), use_container_width=True)
+                save_journal("Quick Entry", text)
+                st.success("Saved as journal entry.")
+
+    import segments
+
+    st.subheader("Long-text mode")
+    st.caption("Scores each sentence (or window of words) on its own, so the heavier parts of a long text stand out.")
+    mode = st.radio("Split into", list(segments.MODES), horizontal=True, key="segment_mode")
+    progress = st.empty()
+    heatmap = st.empty()
+    # Results are kept with the text and split they came from; editing either drops them
+    analyzed = hashlib.sha1(f"{mode}\0{text}".encode("utf-8")).hexdigest()
+    if st.session_state.get("segment_results", {}).get("digest") != analyzed:
+        st.session_state.pop("segment_results", None)
+    if st.button("Analyze by segment", key="analyze_segments"):
+        if not text.strip():
+            st.warning("Please write or paste something to analyze.")
+        else:
+            import charts
+
+            parts, truncated = segments.split_segments(text, mode)
+            scored = []
+            with metrics.timer("op_duration_seconds", op="analyze_segments"):
+                # Each batch is one sparse pass; the heatmap fills in as batches finish
+                for batch in segments.iter_scores(current_model(), parts):
+                    scored.extend(batch)
+                    progress.progress(len(scored) / len(parts), text=f"Scored {len(scored)} of {len(parts)} segments")
+                    heatmap.plotly_chart(
+                        charts.segment_heatmap(scored, len(parts)), use_container_width=True,
+                        key=f"segment_heatmap_{len(scored)}",
+                    )
+            progress.empty()
+            st.session_state.segment_results = {"digest": analyzed, "scored": scored, "truncated": truncated}
+
+    if st.session_state.get("segment_results"):
+        import charts
+
+        scored = st.session_state.segment_results["scored"]
+        heatmap.plotly_chart(charts.segment_heatmap(scored), use_container_width=True, key="segment_heatmap")
+        mean, peak, peak_at = segments.summarize(scored)
+        s1, s2, s3 = st.columns(3)
+        s1.metric("Segments", len(scored))
+        s2.metric("Average risk", f"{mean}%")
+        s3.metric("Peak risk", f"{peak}%", help=f"Segment {peak_at}")
+        if st.session_state.segment_results["truncated"]:
+            st.caption(f"Only the first {segments.MAX_WORDS:,} words were analyzed.")
+        riskiest = sorted(scored, key=lambda s: -s["risk"])[:10]
+        st.dataframe(
+            [{"segment": s["segment"], "risk (%)": s["risk"], "top terms": ", ".join(s["terms"]), "text": s["text"]}
+             for s in riskiest],
+            use_container_width=True, hide_index=True,
+        )
+
+
+# -------------------------
+# PAGE: MOOD TRACKER
+# -------------------------
+def mood_tracker_page() -> None:
+    st.title("Mood Tracker")
+    st.subheader("Log how you feel today")
+    selected = st.selectbox("Pick your mood for today", list(MOOD_LABELS.keys()), index=2)
+    if st.button("Save Mood", key="save_mood"):
+        today = dt.date.today().strftime("%Y-%m-%d")
+        save_mood(today, MOOD_LABELS[selected])
+        st.success("Mood saved ✅")
+
+    df = load_moods()
+    if df.empty:
+        st.info("No moods logged yet. Use the form above to add today's mood.")
+    else:
+        import charts
+
+        st.subheader("Mood Trend")
+        z1, z2 = st.columns([3, 1])
+        zoom = z1.radio("Show", list(charts.ZOOMS), index=len(charts.ZOOMS) - 1, horizontal=True, key="trend_zoom")
+        resolution = z2.selectbox("Resolution", ["auto", *charts.RESOLUTIONS], key="trend_resolution")
+        fig, used = mood_trend_figure(zoom, resolution)
+        st.plotly_chart(fig, use_container_width=True)
+        if used != "day" or len(df) > charts.POINT_BUDGET:
+            st.caption(f"{len(df)} days logged; chart shows {charts.RESOLUTION_LABELS[used]} averages, at most {charts.POINT_BUDGET} points")
+        stats = wellness_store().mood_summary()
+        st.markdown(f"**7-day average mood:** {fmt_avg(stats['avg7'])}")
+
+        st.subheader("Patterns")
+        best, worst = stats["best_streak"], stats["worst_streak"]
+        m1, m2 = st.columns(2)
+        m1.metric("Best logging streak", f"{best['days']} day(s)" if best else "—")
+        m2.metric("Longest low-mood streak", f"{worst['days']} day(s)" if worst else "—")
+        window = st.radio("Average by", ["week", "month"], horizontal=True)
+        st.plotly_chart(
+            period_average_figure(wellness_store().mood_periods(window, limit=52), window), use_container_width=True
+        )
+        if st.button("Clear mood history", key="clear_moods"):
+            wellness_store().clear_moods()
+            st.success("Cleared mood history")
+
+
+# -------------------------
+# PAGE: JOURNAL
+# -------------------------
+def journal_page() -> None:
+    st.title("Journal — Write & Reflect")
+    jtitle = st.text_input("Title (optional)")
+    jtext = st.text_area("Write about your day, thoughts, or paste a post to save:", height=200)
+    c1, c2 = st.columns(2)
+    with c1:
+        if st.button("Save Journal Entry", key="save_journal"):
+            if not jtext.strip():
+                st.warning("Write something before saving.")
+            else:
+                save_journal(jtitle if jtitle else "Untitled", jtext)
+                st.success("Journal saved.")
+    with c2:
+        if st.button("Analyze Journal Text", key="analyze_journal_text"):
+            if not jtext.strip():
+                st.warning("Write something to analyze.")
+            else:
+                score = risk_score(jtext)
+                st.plotly_chart(gauge_figure(score), use_container_width=True)
+                if score >= 60:
+                    st.warning("High likelihood of depressive language. Consider reaching out.")
+                elif score >= 35:
+                    st.info("Moderate indicators — self-care recommended.")
+                else:
+                    st.success("Low indicators.")
+
+    st.markdown("### Your Journal History")
+    score_backlog(wellness_store())
+    entries = wellness_store().journal_count()
+    if not entries:
+        st.info("No journal entries yet.")
+    else:
+        history_pages = max(1, -(-entries // JOURNAL_PAGE_SIZE))
+        history_page = min(st.session_state.get("journal_history_page", 1), history_pages)
+        st.dataframe(load_journal_page(history_page), use_container_width=True, height=250)
+        if history_pages > 1:
+            st.number_input(
+                f"History page (of {history_pages}, newest first)", min_value=1, max_value=history_pages,
+                value=history_page, key="journal_history_page",
+            )
+        scored = load_journal_risk()
+        if not scored.empty:
+            st.plotly_chart(risk_trend_figure(scored), use_container_width=True)
+        _, _, pending = wellness_store().journal_risk()
+        if pending:
+            st.caption(f"{pending} entr{'y' if pending == 1 else 'ies'} waiting for a risk score")
+        q = st.text_input(
+            "Search journal by keyword (optional)",
+            help="All words must match; use word* for prefixes.",
+            on_change=lambda: st.session_state.update(journal_search_page=1),
+        )
+        if q.strip():
+            page_no = st.session_state.get("journal_search_page", 1)
+            total, rows = wellness_store().search_journal(q, page_no, JOURNAL_PAGE_SIZE)
+            pages = max(1, -(-total // JOURNAL_PAGE_SIZE))
+            st.caption(f"{total} matching entr{'y' if total == 1 else 'ies'}, best matches first")
+            if rows:
+                import pandas as pd
+
+                st.dataframe(
+                    pd.DataFrame(rows, columns=["timestamp", "title", "text"]), use_container_width=True, height=250
+                )
+            if pages > 1:
+                st.number_input("Results page", min_value=1, max_value=pages, key="journal_search_page")
+
+
+# -------------------------
+# PAGE: WELLNESS
+# -------------------------
+def wellness_page() -> None:
+    st.title("Wellness Tools")
+    st.subheader("Motivational Thought")
+    st.info(random.choice(QUOTES))
+    st.subheader("Quick Stress Tip")
+    st.success(
+        random.choice(
+            [
+                "Take a 3-minute breathing break (4-4-4).",
+                "Step outside and get 5 minutes of sunlight.",
+                "Write down one small win today.",
+            ]
+        )
+    )
+
+    st.markdown("#### 5-minute breathing coach")
+    if "breath_end" not in st.session_state:
+        st.session_state.breath_end = None
+        st.session_state.breath_running = False
+
+    minutes = st.slider("Minutes", 1, 10, 3)
+    cols = st.columns([1, 1, 1])
+    with cols[0]:
+        if st.button("Start", key="breath_start"):
+            st.session_state.breath_end = time.time() + minutes * 60
+            st.session_state.breath_running = True
+    with cols[1]:
+        if st.button("Stop", key="breath_stop"):
+            st.session_state.breath_running = False
+            st.session_state.breath_end = None
+    with cols[2]:
+        if st.button("Skip", key="breath_skip"):
+            st.session_state.breath_running = False
+            st.session_state.breath_end = None
+
+    if st.session_state.get("breath_running") and st.session_state.breath_end:
+        remaining = st.session_state.breath_end - time.time()
+        if remaining <= 0:
+            st.session_state.breath_running = False
+            st.session_state.breath_end = None
+            st.success("Breathing session complete 🎉")
+        else:
+            breathing_timer(remaining)
+
+
+# -------------------------
+# PAGE: EXPORT
+# -------------------------
+def export_page() -> None:
+    import exports
+
+    st.title("Export Data & Summary")
+    store = wellness_store()
+    score_backlog(store)
+
+    # Nothing below is built until a button is clicked
+    st.subheader("Download your data")
+    st.download_button(
+        "Download wellness_export.zip",
+        lambda: export_bundle(store),
+        file_name=f"wellness_export_{dt.date.today():%Y%m%d}.zip",
+        mime="application/zip",
+        on_click="ignore",
+        help="moods.csv, journal.csv and summary.txt",
+    )
+
+    st.subheader("Mood report (PDF)")
+    if exports.pdf_available():
+        st.download_button(
+            "Download Mood_Report.pdf",
+            lambda: mood_report_pdf(store),
+            file_name="Mood_Report.pdf",
+            mime="application/pdf",
+            on_click="ignore",
+        )
+    else:
+        st.info("Install `reportlab` to enable the PDF report.")
+
+    st.subheader("Summary report (TXT)")
+    txt = summary_text()
+    st.text_area("Summary preview", txt, height=200)
+    st.download_button("Download summary.txt", txt.encode("utf-8"), file_name="summary.txt")
+
+
+PAGES = {
+    "Home": home_page,
+    "Analyze": analyze_page,
+    "Mood Tracker": mood_tracker_page,
+    "Journal": journal_page,
+    "Wellness": wellness_page,
+    "Export": export_page,
+}
+
+
+# -------------------------
+# RERUN: header, sidebar, the selected page, footer
+# -------------------------
+with rerun_profile():
+    st.markdown(
+        "<h1 style='text-align: center; color: white;'>🌐 Social Media Wellness Analyzer</h1>",
+        unsafe_allow_html=True
+    )
+
+    # -------------------------
+    # SIDEBAR NAVIGATION
+    # -------------------------
+    with st.sidebar:
+        st.markdown("---")
+        st.title("Wellness Companion")
+        user_name = st.text_input(
+            "Display name", value=st.session_state.get("display_name", DEFAULT_USER), help="Each name keeps its own data."
+        )
+        st.session_state.display_name = user_name
+        page = st.radio("Navigate", list(PAGES), key="page")
+        # Loading the model here would put it on every page's cold start
+        handle = loaded_handle()
+        st.caption(f"Model {handle.version} ({handle.backend})" if handle else "Model loads on first scan")
+        st.toggle("Profile reruns", key="profile_reruns", help=f"cProfile each rerun; stats are saved under {PROFILE_DIR}/")
+
+    st.sidebar.markdown("---")
+    st.sidebar.markdown(
+        "If you are in crisis, contact local emergency services or a helpline immediately."
+    )
+    for label, link in RESOURCES:
+        if str(link).startswith("http"):
+            st.sidebar.markdown(f"- [{label}]({link})")
+        else:
+            st.sidebar.markdown(f"- **{label}:** {link}")
+
+    metrics.inc("reruns_total", page=page)
+    page_started = time.perf_counter()
+
+    PAGES[page]()
+
+    metrics.observe("page_duration_seconds", time.perf_counter() - page_started, page=page)
+
+    # Footer
+    st.markdown("---")
+    st.caption(
+        "This app is an awareness & self-care tool only — not a medical device. If you are in crisis, contact local emergency services or a helpline immediately."
+    )
+
+    metrics.observe("rerun_duration_seconds", time.perf_counter() - rerun_started, page=page)
+    metrics.record_startup("first_render", time.perf_counter() - script_started)
+    metrics.export()
@@ -0,0 +1,427 @@
+"""Reproducible benchmarks for the project's hot paths.
+
+Every benchmark runs on seeded synthetic data, so two runs on the same
+machine measure the same work. Results are written as JSON and compared
+against a stored baseline; the script exits non-zero when any metric
+regressed by more than ``--tolerance`` or is missing from the baseline (an
+unbaselined metric would otherwise go unchecked). Baselines are machine-specific:
+record one with ``--update-baseline`` on the box you deploy to.
+
+    python benchmark.py                      # run, compare with bench_baseline.json
+    python benchmark.py --quick              # smaller sizes, for a fast smoke run
+    python benchmark.py --update-baseline    # accept the current numbers
+"""
+import argparse
+import datetime as dt
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+
+BASELINE_PATH = "bench_baseline.json"
+RESULTS_PATH = "bench_results.json"
+TOLERANCE = 0.5
+
+NEGATIVE_WORDS = ["sad", "hopeless", "tired", "alone", "worthless", "empty", "cry", "anxious", "numb", "lost"]
+POSITIVE_WORDS = ["happy", "grateful", "excited", "proud", "calm", "fun", "friends", "sunny", "love", "great"]
+FILLER_WORDS = [
+    "today", "work", "school", "sleep", "really", "just", "feel", "think", "time", "day", "week", "people",
+    "family", "know", "want", "going", "life", "thing", "http://example.com", "123", "don't", "it's!",
+]
+
+
+# ==========================
+# Synthetic data
+# ==========================
+def synthetic_posts(n, seed=0, words=(10, 80)):
+    """``n`` ``(text, label)`` pairs that look roughly like the Reddit corpus."""
+    rng = random.Random(seed)
+    posts = []
+    for _ in range(n):
+        label = rng.random() < 0.5
+        vocab = NEGATIVE_WORDS if label else POSITIVE_WORDS
+        length = rng.randint(*words)
+        tokens = [rng.choice(vocab) if rng.random() < 0.15 else rng.choice(FILLER_WORDS) for _ in range(length)]
+        posts.append((" ".join(tokens).capitalize() + ".", int(label)))
+    return posts
+
+
+def synthetic_store(moods, journal, seed=0):
+    """A throwaway ``WellnessStore`` pre-filled with ``moods`` days and ``journal`` entries."""
+    import journal_index
+    import mood_stats
+    from storage import WellnessStore
+
+    root = tempfile.mkdtemp(prefix="wellness-bench-")
+    store = WellnessStore(os.path.join(root, "wellness.db"), mood_csv="", journal_csv="")
+    rng = random.Random(seed)
+    today = dt.date.today()
+    posts = synthetic_posts(journal, seed, words=(5, 30))
+    with store.transaction(write=True) as conn:
+        # Bulk-load, then build the derived tables once, like a migration would
+        conn.executemany(
+            "INSERT INTO moods (date, mood_score) VALUES (?, ?)",
+            (((today - dt.timedelta(days=i)).isoformat(), rng.randint(1, 5)) for i in range(moods)),
+        )
+        conn.executemany(
+            "INSERT INTO journal (timestamp, title, text) VALUES (?, ?, ?)",
+            ((f"2024-01-01 00:00:{i % 60:02d}", f"Entry {i}", text) for i, (text, _) in enumerate(posts)),
+        )
+        mood_stats.rebuild(conn)
+        journal_index.rebuild(conn)
+    return store, root
+
+
+# ==========================
+# Timing helpers
+# ==========================
+def median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def metric(value, unit, higher_is_better=False):
+    return {"value": round(value, 6), "unit": unit, "higher_is_better": higher_is_better}
+
+
+# ==========================
+# Benchmarks
+# ==========================
+def bench_clean_text(results, args):
+    from preprocess import clean_text
+
+    texts = [t for t, _ in synthetic_posts(2000 if args.quick else 20000, seed=1)]
+    started = time.perf_counter()
+    for text in texts:
+        clean_text(text)
+    results["clean_text.throughput"] = metric(len(texts) / (time.perf_counter() - started), "texts/s", True)
+
+
+def bench_predict(results, args):
+    import predict
+    from fast_scorer import FastScorer
+
+    texts = [t for t, _ in synthetic_posts(2000 if args.quick else 20000, seed=2)]
+    one = texts[:200]
+    it = iter(one * 10)
+    results["predict.single_latency"] = metric(median_ms(lambda: predict.predict_depression(next(it)), 500), "ms")
+    started = time.perf_counter()
+    predict.predict_proba_batch(texts)
+    results["predict.batch_throughput"] = metric(len(texts) / (time.perf_counter() - started), "texts/s", True)
+
+    scorer = FastScorer()
+    it = iter(one * 10)
+    results["fast_scorer.single_latency"] = metric(median_ms(lambda: scorer.predict_proba_one(next(it)), 500), "ms")
+
+
+def bench_train(results, args):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    import train
+
+    for n in ([1000, 5000] if args.quick else [1000, 10000, 50000]):
+        posts = synthetic_posts(n, seed=3)
+        texts, labels = [t for t, _ in posts], [y for _, y in posts]
+
+        def fit():
+            X = TfidfVectorizer(**train.TFIDF_PARAMS).fit_transform(texts)
+            LogisticRegression(**train.CLASSIFIER_PARAMS).fit(X, labels)
+
+        results[f"train.fit_time[{n}]"] = metric(median_ms(fit, 1 if n > 10000 else 3), "ms")
+
+
+def downloaded_bundle(data):
+    """Convert ``data`` the way st.download_button does on click and check it is a complete bundle."""
+    from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+    payload, _ = convert_data_to_bytes_and_infer_mime(data, TypeError(f"st.download_button can't send {type(data)}"))
+    with zipfile.ZipFile(io.BytesIO(payload)) as zf:
+        assert sorted(zf.namelist()) == ["journal.csv", "moods.csv", "summary.txt"], zf.namelist()
+        assert zf.testzip() is None
+    return payload
+
+
+def bench_storage(results, args):
+    import exports
+    import wellness_data
+
+    # One mood per day caps mood history: 100k days is already ~270 years
+    sizes = [1000, 10000] if args.quick else [1000, 10000, 100000] + ([1000000] if args.full else [])
+    for n in sizes:
+        store, root = synthetic_store(min(n, 100000), n)
+        try:
+            results[f"load_moods[{n}]"] = metric(median_ms(lambda: wellness_data.load_moods(store), 5), "ms")
+            results[f"load_journal[{n}]"] = metric(median_ms(lambda: wellness_data.load_journal(store), 3), "ms")
+            results[f"journal_page[{n}]"] = metric(median_ms(lambda: wellness_data.load_journal_page(store), 20), "ms")
+            days = iter(range(1, 10 ** 6))
+            future = dt.date.today() + dt.timedelta(days=1)
+            results[f"save_mood[{n}]"] = metric(median_ms(
+                lambda: store.upsert_mood((future + dt.timedelta(days=next(days))).isoformat(), 3), 50
+            ), "ms")
+            posts = iter(synthetic_posts(50, seed=4))
+            results[f"save_journal[{n}]"] = metric(median_ms(
+                lambda: store.add_journal("Bench", next(posts)[0]), 50
+            ), "ms")
+            results[f"summary_text[{n}]"] = metric(median_ms(lambda: wellness_data.summary_text(store), 20), "ms")
+            results[f"search_journal[{n}]"] = metric(median_ms(lambda: store.search_journal("tired sle"), 20), "ms")
+            downloaded_bundle(exports.bundle_buffer(store))
+            results[f"export_bundle[{n}]"] = metric(median_ms(
+                lambda: downloaded_bundle(exports.bundle_buffer(store)), 1 if n > 10000 else 3
+            ), "ms")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_concurrency(results, args):
+    from storage import StorePool
+
+    users, threads, writes = (50, 16, 10) if args.quick else (200, 32, 20)
+    root = tempfile.mkdtemp(prefix="wellness-bench-")
+    pool = StorePool(max_open=users // 2, users_dir=root, default_path=os.path.join(root, "default.db"))
+    names = [f"bench user {i}" for i in range(users)]
+    # Each user gets `writes` journal entries, issued from random threads in random order
+    jobs = [name for name in names for _ in range(writes)]
+    random.Random(5).shuffle(jobs)
+    latencies, lock = [], threading.Lock()
+
+    def worker(my_jobs):
+        mine = []
+        for n, name in enumerate(my_jobs):
+            started = time.perf_counter()
+            store = pool.for_name(name)
+            store.add_journal("Bench", "bench entry")
+            store.upsert_mood((dt.date(2000, 1, 1) + dt.timedelta(days=n % 365)).isoformat(), n % 5 + 1)
+            mine.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(mine)
+
+    try:
+        started = time.perf_counter()
+        workers = [threading.Thread(target=worker, args=(jobs[i::threads],)) for i in range(threads)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - started
+        lost = sum(writes - pool.for_name(name).journal_count() for name in names)
+        if lost:
+            raise RuntimeError(f"{lost} concurrent journal writes were lost")
+        latencies.sort()
+        results["concurrency.write_p50"] = metric(latencies[len(latencies) // 2] * 1000, "ms")
+        results["concurrency.write_p95"] = metric(latencies[int(len(latencies) * 0.95)] * 1000, "ms")
+        results["concurrency.throughput"] = metric(len(jobs) / elapsed, "writes/s", True)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_charts(results, args):
+    import pandas as pd
+
+    import charts
+
+    rng = random.Random(6)
+    for n in ([1000, 10000] if args.quick else [1000, 10000, 100000]):
+        df = pd.DataFrame({
+            "date": pd.date_range(end=dt.date.today(), periods=n, freq="D"),
+            "mood_score": [rng.randint(1, 5) for _ in range(n)],
+        })
+        results[f"mood_trend_figure[{n}]"] = metric(median_ms(lambda: charts.mood_trend_figure(df), 5), "ms")
+        fig, _ = charts.mood_trend_figure(df)
+        results[f"mood_trend_payload[{n}]"] = metric(len(fig.to_json()) / 1024, "KB")
+
+
+def bench_dedup(results, args):
+    import dedup
+
+    for n in ([2000, 10000] if args.quick else [2000, 20000, 100000]):
+        # Every tenth post is a lightly edited copy of an earlier one
+        texts = [t for t, _ in synthetic_posts(n, seed=7)]
+        for i in range(0, n, 10):
+            texts[i] = texts[i // 2] + " edit"
+        started = time.perf_counter()
+        signatures = dedup.minhash(texts)
+        results[f"dedup.minhash[{n}]"] = metric(n / (time.perf_counter() - started), "texts/s", True)
+        results[f"dedup.clusters[{n}]"] = metric(median_ms(lambda: dedup.find_clusters(signatures), 1), "ms")
+
+
+def bench_segments(results, args):
+    import segments
+    from model_service import ModelHandle
+
+    handle = ModelHandle()
+    posts = [t for t, _ in synthetic_posts(4000, seed=8)]
+    for words in ([1000, 10000] if args.quick else [1000, 10000, 50000]):
+        text, n = [], 0
+        for post in posts:
+            text.append(post + ".")
+            n += len(post.split())
+            if n >= words:
+                break
+
+        def analyze():
+            parts, _ = segments.split_segments(" ".join(text))
+            for _ in segments.iter_scores(handle, parts):
+                pass
+
+        results[f"segments.analyze[{words}]"] = metric(median_ms(analyze, 3), "ms")
+
+
+# What a cold app process imports before its first render
+STARTUP_MODULES = ["predict", "preprocess", "storage", "model_service", "wellness_data", "exports"]
+MODEL_FILES = ["model.pkl", "vectorizer.pkl", "fast_model.npz"]
+
+FIRST_RENDER = """
+import sys, time, warnings
+warnings.filterwarnings("ignore")
+sys.path.insert(0, {here!r})
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+started = time.perf_counter()
+at.run()
+first = time.perf_counter() - started
+assert not at.exception, at.exception
+started = time.perf_counter()
+at.run()
+print(first * 1000, (time.perf_counter() - started) * 1000)
+"""
+
+
+def _fresh_python(code, cwd=None):
+    """Run ``code`` in a new interpreter (nothing imported yet) and return its last output line."""
+    out = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True)
+    return out.stdout.strip().splitlines()[-1]
+
+
+def bench_startup(results, args):
+    here = os.path.dirname(os.path.abspath(__file__))
+    repeat = 1 if args.quick else 3
+    for module in STARTUP_MODULES:
+        code = f"import time; t = time.perf_counter(); import {module}; print((time.perf_counter() - t) * 1000)"
+        timings = [float(_fresh_python(code, here)) for _ in range(repeat)]
+        results[f"startup.import[{module}]"] = metric(statistics.median(timings), "ms")
+
+    # First render of the app in a fresh process and an empty data dir (the
+    # Streamlit server itself is already imported when a session starts)
+    renders, reruns = [], []
+    for _ in range(repeat):
+        root = tempfile.mkdtemp(prefix="wellness-bench-")
+        try:
+            for name in MODEL_FILES:
+                if os.path.exists(os.path.join(here, name)):
+                    shutil.copy(os.path.join(here, name), root)
+            code = FIRST_RENDER.format(here=here, app=os.path.join(here, "app.py"))
+            first, warm = map(float, _fresh_python(code, root).split())
+            renders.append(first)
+            reruns.append(warm)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+    results["startup.first_render"] = metric(statistics.median(renders), "ms")
+    results["startup.warm_rerun"] = metric(statistics.median(reruns), "ms")
+
+
+BENCHMARKS = {
+    "clean_text": bench_clean_text,
+    "predict": bench_predict,
+    "train": bench_train,
+    "storage": bench_storage,
+    "concurrency": bench_concurrency,
+    "charts": bench_charts,
+    "dedup": bench_dedup,
+    "segments": bench_segments,
+    "startup": bench_startup,
+}
+
+
+# ==========================
+# Baseline comparison
+# ==========================
+def compare(results, baseline, tolerance):
+    """``([(name, baseline, current, change)] for metrics worse than ``tolerance``, [names with no baseline])``."""
+    regressions, unbaselined = [], []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base or not base["value"]:
+            # A metric the baseline doesn't know is unchecked, not passing
+            unbaselined.append(name)
+            continue
+        change = (current["value"] - base["value"]) / base["value"]
+        if current["higher_is_better"]:
+            change = -change
+        if change > tolerance:
+            regressions.append((name, base["value"], current["value"], change))
+    return regressions, unbaselined
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the project's hot paths.")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run a subset of the groups")
+    parser.add_argument("--quick", action="store_true", help="smaller inputs for a fast smoke run")
+    parser.add_argument("--full", action="store_true", help="include 1M-row storage histories")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed slowdown, e.g. 0.5 = 50%%")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        started = time.perf_counter()
+        BENCHMARKS[name](results, args)
+        print(f"[{name}] done in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    for name, m in results.items():
+        print(f"{name:32s} {m['value']:>14,.3f} {m['unit']}")
+
+    report = {
+        "generated": dt.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "quick": args.quick,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Results saved at: {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("ℹ️ No baseline yet; run with --update-baseline to store one")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("quick") != args.quick:
+        print("⚠️ Baseline was recorded with a different --quick setting; sizes may not line up")
+    regressions, unbaselined = compare(results, baseline["results"], args.tolerance)
+    for name, base, current, change in regressions:
+        print(f"❌ {name}: {base:,.3f} -> {current:,.3f} ({change:+.0%} worse)")
+    for name in unbaselined:
+        print(f"❌ {name}: not in the baseline")
+    if unbaselined:
+        print("ℹ️ Record the new metrics with --update-baseline (on the box the baseline came from)")
+    if regressions or unbaselined:
+        return 1
+    print(f"✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
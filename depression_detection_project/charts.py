@@ -0,0 +1,103 @@
+"""Server-side aggregation for the app's charts.
+
+Long histories are resampled to daily/weekly/monthly averages and then
+thinned with LTTB (Largest-Triangle-Three-Buckets), which keeps the visual
+shape of the line (peaks, dips) while capping the number of points sent to
+the browser. The payload therefore stays roughly constant however many
+years of moods are stored. The segment heatmap likewise gets one cell per
+scored segment, however long the analyzed text is.
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+POINT_BUDGET = 500
+MARKER_LIMIT = 120
+
+ZOOMS = {"3 months": 92, "1 year": 366, "All": None}
+RESOLUTIONS = {"day": "D", "week": "W", "month": "MS"}
+RESOLUTION_LABELS = {"day": "daily", "week": "weekly", "month": "monthly"}
+
+
+def lttb(x, y, threshold):
+    """Indices of the ``threshold`` points LTTB keeps from the series ``(x, y)``."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    every = (n - 2) / (threshold - 2)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        # Third vertex: the average of the next bucket (the last point for the final bucket)
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def auto_resolution(span_days):
+    if span_days <= 184:
+        return "day"
+    if span_days <= 3 * 366:
+        return "week"
+    return "month"
+
+
+def trend_points(df, zoom="All", resolution="auto", budget=POINT_BUDGET):
+    """``(points, resolution)``: ``df`` windowed to ``zoom``, averaged per period and thinned to ``budget``."""
+    if df.empty:
+        return df, resolution
+    days = ZOOMS[zoom]
+    if days is not None:
+        df = df[df["date"] > df["date"].max() - pd.Timedelta(days=days)]
+    if resolution == "auto":
+        resolution = auto_resolution((df["date"].max() - df["date"].min()).days)
+    points = (
+        df.set_index("date")["mood_score"].resample(RESOLUTIONS[resolution]).mean().dropna().reset_index()
+    )
+    if len(points) > budget:
+        x = points["date"].to_numpy(dtype="datetime64[s]").astype(np.int64)
+        points = points.iloc[lttb(x, points["mood_score"].to_numpy(), budget)]
+    return points, resolution
+
+
+def mood_trend_figure(df, zoom="All", resolution="auto", budget=POINT_BUDGET):
+    """Mood line chart with at most ``budget`` points; ``(figure, resolution used)``."""
+    points, resolution = trend_points(df, zoom, resolution, budget)
+    if points.empty:
+        return go.Figure(), resolution
+    title = "Mood Trend" if resolution == "day" else f"Mood Trend ({resolution}ly average)"
+    fig = px.line(points, x="date", y="mood_score", markers=len(points) <= MARKER_LIMIT, title=title)
+    fig.update_layout(height=300, margin=dict(l=10, r=10, t=40, b=10), template="plotly_white", title_x=0.5)
+    fig.update_yaxes(range=[0.5, 5.5], dtick=1)
+    return fig, resolution
+
+
+def segment_heatmap(scored, total=None):
+    """One-row risk heatmap of scored segments (see ``segments.iter_scores``); unscored ones stay blank."""
+    total = total or len(scored)
+    z = [None] * total
+    hover = [""] * total
+    for s in scored:
+        i = s["segment"] - 1
+        z[i] = s["risk"]
+        snippet = s["text"] if len(s["text"]) <= 120 else s["text"][:117] + "..."
+        hover[i] = (f"Segment {s['segment']}: {s['risk']}%<br>"
+                    f"Top terms: {', '.join(s['terms']) or '—'}<br>{snippet}")
+    fig = go.Figure(go.Heatmap(
+        z=[z], x=list(range(1, total + 1)), text=[hover], hoverinfo="text", zmin=0, zmax=100,
+        colorscale=[[0, "#d4edda"], [0.35, "#fff3cd"], [0.6, "#f8d7da"], [1, "crimson"]],
+        colorbar=dict(title="risk (%)", thickness=12),
+    ))
+    fig.update_layout(height=160, margin=dict(l=10, r=10, t=40, b=30), template="plotly_white",
+                      title="Risk by segment", title_x=0.5)
+    fig.update_xaxes(title="segment")
+    fig.update_yaxes(visible=False)
+    return fig
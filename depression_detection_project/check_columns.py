@@ -1,5 +1,9 @@
-import pandas as pd
-
-df = pd.read_csv("dataset/depression_dataset_reddit_cleaned.csv")
-print("Columns in dataset:", df.columns.tolist())
-print(df.head())
+import dataset
+
+# Reads only the header (or the Arrow schema), not the whole corpus
+path = dataset.resolve("dataset/depression_dataset_reddit_cleaned.csv")
+columns, rows = dataset.read_schema(path)
+print("Columns in dataset:", columns)
+if rows is not None:
+    print("Rows:", rows)
+print(next(dataset.iter_batches(path, batch_size=5)))
@@ -0,0 +1,194 @@
+"""Dataset access with an optional columnar (Arrow IPC) copy of the CSVs.
+
+``python dataset.py convert <csv>...`` writes ``<name>.arrow`` next to each
+CSV: an uncompressed Arrow IPC file split into record batches. Readers
+memory-map it, so opening it and reading the schema costs milliseconds, only
+the requested columns are materialized, and batches can be iterated without
+parsing the rest of the file. ``resolve()`` prefers an up-to-date ``.arrow``
+sibling, so callers keep passing the CSV paths they always did.
+
+Arrow support needs the optional ``pyarrow`` package (``pip install
+pyarrow``); without it, or without a converted copy, everything reads the
+CSV with pandas as before. pandas itself is imported on first read, so
+importing this module (e.g. for ``COLUMNS``) stays cheap.
+"""
+import argparse
+import importlib.util
+import os
+import time
+import uuid
+
+ARROW_EXT = ".arrow"
+BATCH_SIZE = 10000
+
+# What training actually reads
+COLUMNS = ["clean_text", "is_depression"]
+
+
+def arrow_available():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def arrow_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ARROW_EXT
+
+
+def resolve(path):
+    """``path``, or its ``.arrow`` copy when that exists, is readable and isn't older than the CSV."""
+    if path.endswith(ARROW_EXT) or not arrow_available():
+        return path
+    columnar = arrow_path(path)
+    if os.path.exists(columnar) and (
+        not os.path.exists(path) or os.stat(columnar).st_mtime_ns >= os.stat(path).st_mtime_ns
+    ):
+        return columnar
+    return path
+
+
+def _is_arrow(path):
+    return path.endswith(ARROW_EXT)
+
+
+def _open_arrow(path):
+    import pyarrow as pa
+
+    return pa.ipc.open_file(pa.memory_map(path, "r"))
+
+
+# ==========================
+# Reading
+# ==========================
+def read_schema(path):
+    """``(column names, row count or None)``; the row count is free for Arrow, unknown for CSV."""
+    if _is_arrow(path):
+        reader = _open_arrow(path)
+        rows = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+        return reader.schema.names, rows
+    import pandas as pd
+
+    return pd.read_csv(path, nrows=0).columns.tolist(), None
+
+
+def read_columns(path, columns=None):
+    """The whole dataset as a DataFrame, materializing only ``columns``."""
+    if _is_arrow(path):
+        table = _open_arrow(path).read_all()
+        if columns is not None:
+            table = table.select(list(columns))
+        return table.to_pandas()
+    import pandas as pd
+
+    return pd.read_csv(path, usecols=columns)
+
+
+def iter_batches(path, columns=None, batch_size=BATCH_SIZE, skip_rows=0):
+    """DataFrames of up to ``batch_size`` rows, starting after the first ``skip_rows`` rows."""
+    if not _is_arrow(path):
+        import pandas as pd
+
+        yield from pd.read_csv(
+            path, usecols=columns, chunksize=batch_size, skiprows=range(1, skip_rows + 1) if skip_rows else None
+        )
+        return
+
+    import pyarrow as pa
+
+    reader = _open_arrow(path)
+    pending = []
+    pending_rows = 0
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        if skip_rows >= batch.num_rows:
+            skip_rows -= batch.num_rows
+            continue
+        if skip_rows:
+            batch, skip_rows = batch.slice(skip_rows), 0
+        # Zero-copy views of the mapped file until to_pandas()
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        while pending_rows >= batch_size:
+            table = pa.Table.from_batches(pending)
+            head, rest = table.slice(0, batch_size), table.slice(batch_size)
+            yield (head.select(list(columns)) if columns else head).to_pandas()
+            pending, pending_rows = rest.to_batches(), rest.num_rows
+    if pending_rows:
+        table = pa.Table.from_batches(pending)
+        yield (table.select(list(columns)) if columns else table).to_pandas()
+
+
+# ==========================
+# CSV -> Arrow conversion
+# ==========================
+def _arrow_schema(df):
+    import pandas as pd
+    import pyarrow as pa
+
+    fields = []
+    for name, dtype in df.dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype):
+            kind = pa.bool_()
+        elif pd.api.types.is_integer_dtype(dtype):
+            kind = pa.int64()
+        elif pd.api.types.is_float_dtype(dtype):
+            kind = pa.float64()
+        else:
+            kind = pa.string()
+        fields.append(pa.field(str(name), kind))
+    return pa.schema(fields)
+
+
+def convert_csv(src, dst=None, batch_size=BATCH_SIZE):
+    """Stream ``src`` into an uncompressed (memory-mappable) Arrow IPC file; returns its path."""
+    import pandas as pd
+    import pyarrow as pa
+
+    dst = dst or arrow_path(src)
+    tmp = f"{dst}.{uuid.uuid4().hex[:8]}.tmp"
+    started = time.perf_counter()
+    rows = 0
+    schema = writer = None
+    try:
+        with pa.OSFile(tmp, "wb") as sink:
+            for chunk in pd.read_csv(src, chunksize=batch_size):
+                if schema is None:
+                    schema = _arrow_schema(chunk)
+                    writer = pa.ipc.new_file(sink, schema)
+                for field in schema:
+                    if pa.types.is_string(field.type):
+                        column = chunk[field.name]
+                        chunk[field.name] = column.where(column.isna(), column.astype(str))
+                writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+                rows += len(chunk)
+            if writer is None:
+                writer = pa.ipc.new_file(sink, _arrow_schema(pd.read_csv(src, nrows=0)))
+            writer.close()
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    print(f"✅ {src} -> {dst} ({rows} rows, {time.perf_counter() - started:.2f}s)")
+    return dst
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Columnar copies of the dataset CSVs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert = sub.add_parser("convert", help="write <name>.arrow next to each CSV")
+    convert.add_argument("csv", nargs="+")
+    convert.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per record batch")
+    info = sub.add_parser("info", help="print columns, rows and open time")
+    info.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        if not arrow_available():
+            raise SystemExit("❌ Arrow support needs pyarrow: pip install pyarrow")
+        for path in args.csv:
+            convert_csv(path, batch_size=args.batch_size)
+    else:
+        path = resolve(args.path)
+        started = time.perf_counter()
+        columns, rows = read_schema(path)
+        print(f"{path}: {columns}, {rows if rows is not None else 'unknown'} rows "
+              f"({(time.perf_counter() - started) * 1000:.1f} ms)")
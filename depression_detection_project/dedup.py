@@ -0,0 +1,224 @@
+"""Near-duplicate removal with MinHash signatures and LSH banding.
+
+Every post becomes a set of word shingles. A MinHash signature of
+``num_perm`` values estimates the Jaccard similarity of two such sets as the
+fraction of positions where their signatures agree. LSH cuts the signature
+into bands and only compares posts that share an identical band, so the
+pairs above ``threshold`` are found in roughly linear time instead of by
+comparing every pair of posts.
+
+The kept post of a cluster is its first row; the removed ones are listed in
+a JSON report so the clusters can be reviewed.
+
+    python dedup.py dataset/processed_depression.csv --threshold 0.8
+"""
+import argparse
+import json
+import os
+import time
+import uuid
+import zlib
+from collections import defaultdict
+from functools import partial
+
+import numpy as np
+
+import dataset
+from dataset import COLUMNS
+from parallel import bounded_map, default_workers
+
+THRESHOLD = 0.8
+NUM_PERM = 128
+SHINGLE_SIZE = 3
+SEED = 1
+CHUNK_SIZE = 5000
+REPORT_PATH = "dataset/dedup_report.json"
+SAMPLE_CHARS = 160
+
+# Universal hashing (a * x + b) mod p over 32-bit shingle hashes
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+# ==========================
+# Signatures
+# ==========================
+def shingles(text, size=SHINGLE_SIZE):
+    """Set of ``size``-word shingles of ``text`` (the whole text when it is shorter)."""
+    words = str(text).split()
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _permutations(num_perm, seed):
+    rng = np.random.default_rng(seed)
+    return (rng.integers(1, _PRIME, num_perm, dtype=np.uint64),
+            rng.integers(0, _PRIME, num_perm, dtype=np.uint64))
+
+
+def minhash(texts, num_perm=NUM_PERM, size=SHINGLE_SIZE, seed=SEED):
+    """``(len(texts), num_perm)`` uint32 MinHash signatures."""
+    a, b = _permutations(num_perm, seed)
+    out = np.empty((len(texts), num_perm), dtype=np.uint32)
+    for i, text in enumerate(texts):
+        # crc32, unlike hash(), is the same in every process and run
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles(text, size)), dtype=np.uint64)
+        # One column per permutation; uint64 wraparound in a * x is part of the hash
+        out[i] = ((np.outer(hashes, a) + b) % _PRIME & _MAX_HASH).min(axis=0)
+    return out
+
+
+def _signature_chunk(texts, num_perm, size, seed):
+    # Runs in a worker process
+    return minhash(texts, num_perm, size, seed)
+
+
+# ==========================
+# LSH clustering
+# ==========================
+def lsh_params(threshold, num_perm=NUM_PERM):
+    """``(bands, rows)`` whose candidate S-curve ``(1/bands) ** (1/rows)`` sits just below ``threshold``.
+
+    Candidates are verified against the whole signature, so erring towards
+    more candidates only costs time, while erring the other way misses pairs.
+    """
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    below = [(b, r) for b, r in options if (1 / b) ** (1 / r) <= threshold]
+    return max(below, key=lambda br: (1 / br[0]) ** (1 / br[1])) if below else (num_perm, 1)
+
+
+def find_clusters(signatures, threshold=THRESHOLD):
+    """Lists of row indices (ascending, size >= 2) whose estimated Jaccard similarity is >= ``threshold``."""
+    n, num_perm = signatures.shape
+    bands, rows = lsh_params(threshold, num_perm)
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        buckets = defaultdict(list)
+        for i, key in enumerate(block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()):
+            buckets[key.tobytes()].append(i)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            # Each member joins the first representative it really matches, or becomes one
+            reps = [members[0]]
+            for j in members[1:]:
+                for rep in reps:
+                    if find(j) == find(rep):
+                        break
+                    if (signatures[rep] == signatures[j]).mean() >= threshold:
+                        parent[find(j)] = find(rep)
+                        break
+                else:
+                    reps.append(j)
+
+    clusters = defaultdict(list)
+    for i in range(n):
+        clusters[find(i)].append(i)
+    return sorted((c for c in clusters.values() if len(c) > 1), key=lambda c: (-len(c), c[0]))
+
+
+# ==========================
+# File stage
+# ==========================
+def _tmp_path(path):
+    return f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+
+
+def dedup_file(src, dst=None, threshold=THRESHOLD, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE,
+               report_path=REPORT_PATH, chunk_size=CHUNK_SIZE, workers=None):
+    """Write ``src`` minus near-duplicate rows to ``dst`` (default: in place); returns the report dict.
+
+    Two streaming passes: signatures first (in parallel chunks), then a copy
+    that skips the removed rows. Memory holds ``4 * num_perm`` bytes per row.
+    """
+    if dst is None and src.endswith(dataset.ARROW_EXT):
+        raise ValueError("Deduplicating an Arrow file needs a CSV dst")
+    dst = dst or src
+    started = time.perf_counter()
+    texts = (batch["clean_text"].astype(str).tolist() for batch in dataset.iter_batches(src, COLUMNS, chunk_size))
+    signature_chunk = partial(_signature_chunk, num_perm=num_perm, size=shingle_size, seed=SEED)
+    chunks = list(bounded_map(signature_chunk, texts, workers=workers))
+    signatures = np.vstack(chunks) if chunks else np.empty((0, num_perm), dtype=np.uint32)
+    clusters = find_clusters(signatures, threshold)
+    removed = {i for cluster in clusters for i in cluster[1:]}
+    in_cluster = {i: n for n, cluster in enumerate(clusters) for i in cluster}
+
+    samples = {}
+    labels = [defaultdict(int) for _ in clusters]
+    offset = 0
+    tmp = _tmp_path(dst)
+    try:
+        with open(tmp, "wb") as out:
+            out.write((",".join(COLUMNS) + "\n").encode("utf-8"))
+            for batch in dataset.iter_batches(src, COLUMNS, chunk_size):
+                index = range(offset, offset + len(batch))
+                for row, text, label in zip(index, batch["clean_text"], batch["is_depression"]):
+                    n = in_cluster.get(row)
+                    if n is not None:
+                        labels[n][str(label)] += 1
+                        samples.setdefault(n, str(text)[:SAMPLE_CHARS])
+                keep = [row not in removed for row in index]
+                out.write(batch[keep].to_csv(index=False, header=False).encode("utf-8"))
+                offset += len(batch)
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    bands, rows = lsh_params(threshold, num_perm)
+    report = {
+        "source": src,
+        "threshold": threshold,
+        "num_perm": num_perm,
+        "bands": bands,
+        "rows_per_band": rows,
+        "shingle_size": shingle_size,
+        "rows": offset,
+        "kept": offset - len(removed),
+        "removed": len(removed),
+        "seconds": round(time.perf_counter() - started, 3),
+        # Row numbers are 0-based data rows of the source, before removal
+        "clusters": [
+            {"size": len(cluster), "kept_row": cluster[0], "removed_rows": cluster[1:],
+             "labels": dict(labels[n]), "sample": samples.get(n, "")}
+            for n, cluster in enumerate(clusters)
+        ],
+    }
+    if report_path:
+        os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+        tmp = _tmp_path(report_path)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, report_path)
+
+    mixed = sum(1 for counts in labels if len(counts) > 1)
+    print(f"🧹 Removed {len(removed)} near-duplicate rows in {len(clusters)} clusters "
+          f"(threshold {threshold}, {report['seconds']:.2f}s)")
+    if mixed:
+        print(f"⚠️ {mixed} cluster(s) mix both labels; the first row's label was kept")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Remove near-duplicate posts from a processed dataset CSV.")
+    parser.add_argument("src", nargs="?", default="dataset/processed_depression.csv")
+    parser.add_argument("--output", help="where to write the deduplicated CSV (default: in place)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Jaccard similarity counted as duplicate")
+    parser.add_argument("--num-perm", type=int, default=NUM_PERM, help="MinHash signature length")
+    parser.add_argument("--report", default=REPORT_PATH, help="JSON report of the removed clusters")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="signature processes")
+    args = parser.parse_args()
+    if not 0 < args.threshold <= 1:
+        parser.error("--threshold must be in (0, 1]")
+    dedup_file(args.src, args.output, args.threshold, args.num_perm, report_path=args.report, workers=args.workers)
+    print(f"📄 Report saved at: {args.report}")
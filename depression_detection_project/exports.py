@@ -0,0 +1,194 @@
+"""Streaming data export and cached PDF reports.
+
+The zip bundle (moods.csv, journal.csv, summary.txt) is produced by a
+generator: rows are streamed out of SQLite in batches, CSV-encoded into a
+small buffer and pushed through a zip writer that never seeks, so memory
+stays bounded however long the history is.
+
+PDF reports need the optional ``reportlab`` package (``pip install
+reportlab``). A report is built once per user, data version and day, and
+reused until something is written to that user's store or the date changes.
+
+    python exports.py --user Friend --output wellness_export.zip --pdf Mood_Report.pdf
+"""
+import argparse
+import csv
+import datetime as dt
+import hashlib
+import importlib.util
+import io
+import os
+import uuid
+import zipfile
+from collections import deque
+from xml.sax.saxutils import escape
+
+import wellness_data
+
+REPORT_DIR = os.path.join("cache", "reports")
+FLUSH_BYTES = 64 * 1024
+RECENT_WEEKS = 12
+RECENT_ENTRIES = 10
+
+
+# ==========================
+# Streaming zip bundle
+# ==========================
+def iter_csv(header, rows, flush_bytes=FLUSH_BYTES):
+    """UTF-8 CSV of ``rows`` in chunks of roughly ``flush_bytes``."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= flush_bytes:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable target that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_bundle(store):
+    """Zip archive of the store's moods, journal and summary, as a stream of byte chunks."""
+    sink = _ChunkSink()
+    members = [
+        ("moods.csv", lambda: iter_csv(["date", "mood_score"], store.iter_moods())),
+        ("journal.csv", lambda: iter_csv(["timestamp", "title", "text", "risk_score"], store.iter_journal())),
+        ("summary.txt", lambda: [wellness_data.summary_text(store).encode("utf-8")]),
+    ]
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, chunks in members:
+            # force_zip64: sizes aren't known up front, and journals can pass 4 GB uncompressed
+            with zf.open(name, "w", force_zip64=True) as member:
+                for chunk in chunks():
+                    member.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+    yield sink.drain()
+
+
+def _tmp_path(path):
+    return f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+
+
+def write_bundle(store, path):
+    tmp = _tmp_path(path)
+    with open(tmp, "wb") as f:
+        for chunk in iter_bundle(store):
+            f.write(chunk)
+    os.replace(tmp, path)
+    return path
+
+
+def bundle_buffer(store):
+    """The whole bundle in a BytesIO, one of the types st.download_button can send."""
+    out = io.BytesIO()
+    for chunk in iter_bundle(store):
+        out.write(chunk)
+    out.seek(0)
+    return out
+
+
+# ==========================
+# PDF report
+# ==========================
+def pdf_available():
+    return importlib.util.find_spec("reportlab") is not None
+
+
+def build_pdf(store, path):
+    """Write a one-page mood report for ``store`` to ``path`` (requires reportlab)."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    styles = getSampleStyleSheet()
+    story = [Paragraph("Mood Report", styles["Title"])]
+    for line in wellness_data.summary_text(store).splitlines():
+        story.append(Paragraph(escape(line), styles["Normal"]))
+
+    weeks = store.mood_periods("week", limit=RECENT_WEEKS)
+    if weeks:
+        story += [Spacer(1, 12), Paragraph("Average mood by week", styles["Heading2"])]
+        table = Table([["Week", "Average (1-5)", "Days logged"]]
+                      + [[week, f"{avg:.2f}", days] for week, avg, days in weeks])
+        table.setStyle(TableStyle([
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.whitesmoke),
+        ]))
+        story.append(table)
+
+    recent = deque((row for row in store.iter_journal() if row[3] is not None), maxlen=RECENT_ENTRIES)
+    if recent:
+        story += [Spacer(1, 12), Paragraph("Recent journal risk", styles["Heading2"])]
+        for timestamp, title, _, risk in reversed(recent):
+            story.append(Paragraph(f"{escape(timestamp)} — {escape(title or 'Untitled')}: {risk:.1f}%",
+                                   styles["Normal"]))
+
+    story += [Spacer(1, 18), Paragraph(
+        "This report is for awareness & self-care only — not a medical diagnosis.", styles["Italic"]
+    )]
+    tmp = _tmp_path(path)
+    SimpleDocTemplate(tmp, pagesize=A4, title="Mood Report").build(story)
+    os.replace(tmp, path)
+    return path
+
+
+def cached_pdf(store, root=REPORT_DIR):
+    """Path of the store's report for its current data version and today's date, building it only if missing."""
+    os.makedirs(root, exist_ok=True)
+    prefix = hashlib.sha1(os.path.abspath(store.path).encode("utf-8")).hexdigest()[:12]
+    # Streaks and rolling averages move with the date, not only with new data
+    current = (f"{dt.date.today():%Y%m%d}", store.version)
+    path = os.path.join(root, f"{prefix}-{current[0]}-v{current[1]}.pdf")
+    if not os.path.exists(path):
+        build_pdf(store, path)
+        # Reports of earlier days or versions can't be served again
+        for name in os.listdir(root):
+            stem, ext = os.path.splitext(name)
+            day, _, old = stem[len(prefix) + 1:].partition("-v")
+            if stem.startswith(f"{prefix}-") and ext == ".pdf" and old.isdigit() and (day, int(old)) < current:
+                try:
+                    os.remove(os.path.join(root, name))
+                except FileNotFoundError:
+                    pass
+    return path
+
+
+if __name__ == "__main__":
+    from storage import get_store_pool
+
+    parser = argparse.ArgumentParser(description="Export a user's wellness data.")
+    parser.add_argument("--user", default=None, help="display name (default: the default user)")
+    parser.add_argument("--output", default=f"wellness_export_{dt.date.today():%Y%m%d}.zip")
+    parser.add_argument("--pdf", help="also write the PDF report here (requires reportlab)")
+    args = parser.parse_args()
+
+    store = get_store_pool().for_name(args.user)
+    print(f"📦 Bundle saved at: {write_bundle(store, args.output)}")
+    if args.pdf:
+        if not pdf_available():
+            raise SystemExit("❌ PDF reports need reportlab: pip install reportlab")
+        print(f"📄 Report saved at: {build_pdf(store, args.pdf)}")
@@ -0,0 +1,252 @@
+"""Folded TF-IDF + logistic regression scorer that runs without scikit-learn.
+
+Because the model is linear, the TF-IDF step and the classifier fold into
+two per-term arrays:
+
+    x_j   = tf_j * idf_j
+    score = sum(x_j * coef_j) / ||x|| + intercept
+
+so we only keep ``idf`` (for the L2 norm) and ``weight = idf * coef`` next to
+the vocabulary. ``export`` writes them into one uncompressed ``.npz``; loading
+it needs only NumPy, and scoring a text is a single sparse dot product.
+"""
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import uuid
+
+import numpy as np
+
+FAST_MODEL_PATH = "fast_model.npz"
+FORMAT_VERSION = 1
+
+
+# ==========================
+# Export (needs the sklearn pickles)
+# ==========================
+def export_fast_model(model, vectorizer, path=FAST_MODEL_PATH, dtype="float32"):
+    """Fold a fitted TfidfVectorizer + binary linear classifier into ``path``."""
+    if not hasattr(vectorizer, "vocabulary_") or not hasattr(vectorizer, "idf_"):
+        raise ValueError("Only a fitted TfidfVectorizer with idf weights can be folded")
+    if vectorizer.analyzer != "word" or vectorizer.norm not in ("l2", None):
+        raise ValueError("Only word analyzers with l2/no norm can be folded")
+
+    classes = list(model.classes_)
+    coef = np.asarray(model.coef_[0], dtype=np.float64)
+    intercept = float(model.intercept_[0])
+    if classes[1] != 1:
+        coef, intercept = -coef, -intercept
+
+    n_features = len(vectorizer.vocabulary_)
+    tokens = [None] * n_features
+    for token, j in vectorizer.vocabulary_.items():
+        tokens[j] = token
+    idf = np.asarray(vectorizer.idf_, dtype=np.float64)
+
+    config = {
+        "format_version": FORMAT_VERSION,
+        "lowercase": bool(vectorizer.lowercase),
+        "token_pattern": vectorizer.token_pattern,
+        "stop_words": sorted(vectorizer.get_stop_words() or []),
+        "ngram_range": list(vectorizer.ngram_range),
+        "binary": bool(vectorizer.binary),
+        "sublinear_tf": bool(vectorizer.sublinear_tf),
+        "norm": vectorizer.norm,
+        "intercept": intercept,
+    }
+    # Written next to the target and renamed into place: the app may reload while we write
+    tmp = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                # Newline-joined UTF-8 blob: far smaller than a fixed-width unicode array
+                tokens=np.frombuffer("\n".join(tokens).encode("utf-8"), dtype=np.uint8),
+                idf=idf.astype(dtype),
+                weight=(idf * coef).astype(dtype),
+                config=np.array(json.dumps(config)),
+            )
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return path
+
+
+# ==========================
+# Scoring (NumPy only)
+# ==========================
+class FastScorer:
+    def __init__(self, path=FAST_MODEL_PATH):
+        with np.load(path) as data:
+            config = json.loads(str(data["config"]))
+            if config["format_version"] != FORMAT_VERSION:
+                raise ValueError(f"Unsupported fast model format: {config['format_version']}")
+            tokens = data["tokens"].tobytes().decode("utf-8").split("\n")
+            self.tokens = tokens
+            self.index = {token: j for j, token in enumerate(tokens)}
+            self.idf = data["idf"].astype(np.float64)
+            self.weight = data["weight"].astype(np.float64)
+        self.lowercase = config["lowercase"]
+        self.token_re = re.compile(config["token_pattern"])
+        self.stop_words = frozenset(config["stop_words"])
+        self.min_n, self.max_n = config["ngram_range"]
+        self.binary = config["binary"]
+        self.sublinear_tf = config["sublinear_tf"]
+        self.norm = config["norm"]
+        self.intercept = config["intercept"]
+
+    def _terms(self, text):
+        # Mirrors sklearn's word analyzer: preprocess -> tokenize -> stop words -> n-grams
+        if self.lowercase:
+            text = text.lower()
+        tokens = self.token_re.findall(text)
+        if self.token_re.groups == 1:
+            tokens = [t if isinstance(t, str) else t[0] for t in tokens]
+        if self.stop_words:
+            tokens = [t for t in tokens if t not in self.stop_words]
+        if self.max_n == 1:
+            return tokens
+        terms = list(tokens) if self.min_n == 1 else []
+        for n in range(max(self.min_n, 2), min(self.max_n, len(tokens)) + 1):
+            for i in range(len(tokens) - n + 1):
+                terms.append(" ".join(tokens[i:i + n]))
+        return terms
+
+    def term_counts(self, text):
+        """Sparse term-frequency vector of ``text`` as ``{feature index: count}``."""
+        counts = {}
+        index = self.index
+        for term in self._terms("" if text is None else str(text)):
+            j = index.get(term)
+            if j is not None:
+                counts[j] = counts.get(j, 0) + 1
+        return counts
+
+    def decision_function(self, text):
+        counts = self.term_counts(text)
+        if not counts:
+            return self.intercept
+        idx = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        if self.binary:
+            tf[:] = 1.0
+        elif self.sublinear_tf:
+            tf = 1.0 + np.log(tf)
+        dot = float(tf @ self.weight[idx])
+        if self.norm == "l2":
+            dot /= float(np.sqrt(np.square(tf * self.idf[idx]).sum()))
+        return dot + self.intercept
+
+    def predict_proba_one(self, text):
+        """P(depressed) for a single text."""
+        z = self.decision_function(text)
+        return 1.0 / (1.0 + math.exp(-z)) if z >= 0 else math.exp(z) / (1.0 + math.exp(z))
+
+    def predict_proba(self, texts):
+        """P(depressed) for each text, as a float array."""
+        return np.fromiter((self.predict_proba_one(t) for t in texts), dtype=np.float64)
+
+    def explain(self, texts, top=3):
+        """``(P(depressed) per text, top terms per text)`` in one vectorized pass over all texts.
+
+        The texts' term counts are laid out as one CSR matrix. A term's logit
+        contribution is ``tf_j * weight_j / ||x||``.
+        """
+        indptr, indices, tf = [0], [], []
+        for text in texts:
+            counts = self.term_counts(text)
+            indices.extend(counts)
+            tf.extend(counts.values())
+            indptr.append(len(indices))
+        indptr = np.asarray(indptr, dtype=np.intp)
+        indices = np.asarray(indices, dtype=np.intp)
+        tf = np.asarray(tf, dtype=np.float64)
+        if self.binary:
+            tf[:] = 1.0
+        elif self.sublinear_tf:
+            tf = 1.0 + np.log(tf)
+        rows = np.repeat(np.arange(len(texts)), np.diff(indptr))
+        contrib = tf * self.weight[indices]
+        if self.norm == "l2":
+            norms = np.sqrt(np.bincount(rows, weights=np.square(tf * self.idf[indices]), minlength=len(texts)))
+            contrib /= np.where(norms > 0, norms, 1.0)[rows]
+        z = np.bincount(rows, weights=contrib, minlength=len(texts)) + self.intercept
+        # Numerically stable sigmoid
+        probs = np.exp(-np.logaddexp(0.0, -z))
+        return probs, top_terms(indptr, indices, contrib, self.tokens, top)
+
+
+def top_terms(indptr, indices, values, names, top=3):
+    """Per CSR row of logit contributions, the ``top`` largest positive ``(term, contribution)`` pairs."""
+    out = []
+    for start, end in zip(indptr[:-1], indptr[1:]):
+        row = values[start:end]
+        best = np.argsort(row)[::-1][:top]
+        out.append([(names[indices[start + k]], float(row[k])) for k in best if row[k] > 0])
+    return out
+
+
+# ==========================
+# Parity check against the sklearn pipeline
+# ==========================
+def verify_parity(texts, path=FAST_MODEL_PATH, tol=1e-4):
+    """Return the max |p_fast - p_sklearn| over raw ``texts``; raise if above ``tol``."""
+    import predict
+    from preprocess import clean_text
+
+    texts = list(texts)
+    expected = predict.predict_proba_batch(texts)
+    # The fast scorer gets what ModelHandle hands it: already-cleaned text
+    actual = FastScorer(path).predict_proba([clean_text(t) for t in texts])
+    worst = float(np.max(np.abs(expected - actual))) if texts else 0.0
+    if worst > tol:
+        raise AssertionError(f"Fast scorer differs from sklearn by {worst:.2e} (tolerance {tol:.0e})")
+    return worst
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or verify the folded fast scorer.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export_p = sub.add_parser("export", help="fold model.pkl + vectorizer.pkl into a .npz artifact")
+    export_p.add_argument("--output", default=FAST_MODEL_PATH)
+    export_p.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+
+    verify_p = sub.add_parser("verify", help="compare fast scorer output with the sklearn pipeline")
+    verify_p.add_argument("--model", default=FAST_MODEL_PATH)
+    verify_p.add_argument("--data", default="dataset/processed_depression.csv")
+    verify_p.add_argument("--sample", type=int, default=2000, help="rows of --data to compare")
+    verify_p.add_argument("--tol", type=float, default=1e-4)
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        import pickle
+
+        with open("model.pkl", "rb") as f:
+            model = pickle.load(f)
+        with open("vectorizer.pkl", "rb") as f:
+            vectorizer = pickle.load(f)
+        export_fast_model(model, vectorizer, args.output, args.dtype)
+        print(f"✅ Fast model saved at: {args.output}")
+    else:
+        import csv
+
+        with open(args.data, newline="", encoding="utf-8") as f:
+            rows = csv.DictReader(f)
+            texts = [row["clean_text"] for _, row in zip(range(args.sample), rows)]
+        texts += ["", "I feel hopeless and alone", "Had a GREAT day at the beach!!"]
+        try:
+            worst = verify_parity(texts, args.model, args.tol)
+        except AssertionError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"✅ Fast scorer matches sklearn on {len(texts)} texts (max diff {worst:.2e})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""On-disk cache of vectorized feature matrices.
+
+Entries are keyed by the input file (path, size, mtime) plus the vectorizer
+config, so a repeated training run with the same data and settings loads the
+sparse matrices instead of featurizing the corpus again. An entry is built in
+a temporary directory and renamed into place, so an interrupted run never
+leaves a half-written entry behind.
+"""
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import uuid
+
+import numpy as np
+import scipy.sparse as sp
+
+CACHE_DIR = os.path.join("cache", "features")
+
+
+def data_fingerprint(path):
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def cache_key(data_path, config):
+    """Stable key for ``config`` (any JSON-able dict) applied to ``data_path``."""
+    payload = json.dumps({"data": data_fingerprint(data_path), "config": config}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class FeatureCache:
+    def __init__(self, key, root=CACHE_DIR):
+        self.path = os.path.join(root, key)
+        self._building = None
+
+    @property
+    def complete(self):
+        return os.path.isdir(self.path)
+
+    # -------------------------
+    # Reading
+    # -------------------------
+    def load_matrix(self, name):
+        return sp.load_npz(os.path.join(self.path, f"{name}.npz"))
+
+    def load_array(self, name):
+        return np.load(os.path.join(self.path, f"{name}.npy"))
+
+    def load_object(self, name):
+        with open(os.path.join(self.path, f"{name}.pkl"), "rb") as f:
+            return pickle.load(f)
+
+    def batch_count(self):
+        return sum(1 for name in os.listdir(self.path) if name.startswith("X_"))
+
+    def load_batch(self, i):
+        """The ``(X, y)`` pair written by the ``i``-th ``add_batch`` call."""
+        return self.load_matrix(f"X_{i:05d}"), self.load_array(f"y_{i:05d}")
+
+    # -------------------------
+    # Writing: begin() ... add_*() ... commit()
+    # -------------------------
+    def begin(self):
+        self._building = f"{self.path}.{uuid.uuid4().hex[:8]}.tmp"
+        os.makedirs(self._building)
+        self._batches = 0
+
+    def add_matrix(self, name, matrix):
+        sp.save_npz(os.path.join(self._building, f"{name}.npz"), sp.csr_matrix(matrix), compressed=False)
+
+    def add_array(self, name, array):
+        np.save(os.path.join(self._building, f"{name}.npy"), np.asarray(array))
+
+    def add_object(self, name, obj):
+        with open(os.path.join(self._building, f"{name}.pkl"), "wb") as f:
+            pickle.dump(obj, f)
+
+    def add_batch(self, X, y):
+        self.add_matrix(f"X_{self._batches:05d}", X)
+        self.add_array(f"y_{self._batches:05d}", y)
+        self._batches += 1
+
+    def commit(self):
+        if self.complete:
+            # Another run finished the same entry first
+            shutil.rmtree(self._building)
+        else:
+            os.replace(self._building, self.path)
+        self._building = None
+
+    def abort(self):
+        if self._building:
+            shutil.rmtree(self._building, ignore_errors=True)
+            self._building = None
@@ -0,0 +1,142 @@
+"""Persistent inverted index over journal entries.
+
+Entries are tokenized with ``preprocess.clean_text`` and posted to
+``journal_terms`` (term -> entry, term frequency) when they are saved, so a
+search only touches the posting lists of its query terms. The
+``(term, entry_id)`` primary key also serves prefix queries as an index range
+scan. Results are ranked with BM25.
+"""
+import math
+
+from preprocess import clean_text
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal_terms (
+    term TEXT NOT NULL,
+    entry_id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, entry_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS journal_doclen (
+    entry_id INTEGER PRIMARY KEY,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS journal_index_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    docs INTEGER NOT NULL,
+    total_length INTEGER NOT NULL
+);
+"""
+
+
+def tokenize(text):
+    return clean_text(str(text or "")).split()
+
+
+def index_entry(conn, entry_id, title, text):
+    """Post one journal entry (title + body) to the index."""
+    tokens = tokenize(title) + tokenize(text)
+    counts = {}
+    for token in tokens:
+        counts[token] = counts.get(token, 0) + 1
+    conn.executemany(
+        "INSERT OR REPLACE INTO journal_terms (term, entry_id, tf) VALUES (?, ?, ?)",
+        ((term, entry_id, tf) for term, tf in counts.items()),
+    )
+    conn.execute("INSERT OR REPLACE INTO journal_doclen (entry_id, length) VALUES (?, ?)", (entry_id, len(tokens)))
+    conn.execute(
+        "INSERT INTO journal_index_stats (id, docs, total_length) VALUES (1, 1, ?) "
+        "ON CONFLICT (id) DO UPDATE SET docs = docs + 1, total_length = total_length + excluded.total_length",
+        (len(tokens),),
+    )
+
+
+def rebuild(conn):
+    """Re-index every journal entry (one-off, for existing databases)."""
+    conn.execute("DELETE FROM journal_terms")
+    conn.execute("DELETE FROM journal_doclen")
+    conn.execute("DELETE FROM journal_index_stats")
+    for entry_id, title, text in conn.execute("SELECT id, title, text FROM journal").fetchall():
+        index_entry(conn, entry_id, title, text)
+
+
+def parse_query(query):
+    """``[(term, is_prefix)]``: ``word*`` is a prefix query, and so is the last word (search-as-you-type)."""
+    words = query.split()
+    terms = []
+    for i, word in enumerate(words):
+        prefix = word.endswith("*") or i == len(words) - 1
+        tokens = tokenize(word)
+        for j, token in enumerate(tokens):
+            # Punctuation inside a word ("don't") can split it; only its tail keeps the prefix flag
+            terms.append((token, prefix and j == len(tokens) - 1))
+    return terms
+
+
+def _postings(conn, term, prefix):
+    if prefix:
+        rows = conn.execute(
+            "SELECT term, entry_id, tf FROM journal_terms WHERE term >= ? AND term < ?",
+            (term, term + "\U0010ffff"),
+        )
+    else:
+        rows = conn.execute("SELECT term, entry_id, tf FROM journal_terms WHERE term = ?", (term,))
+    by_term = {}
+    for t, entry_id, tf in rows:
+        by_term.setdefault(t, {})[entry_id] = tf
+    return by_term
+
+
+def _idf(docs, df):
+    return math.log(1 + (docs - df + 0.5) / (df + 0.5))
+
+
+def search(conn, query, page=1, page_size=20):
+    """Entries matching every query term, best BM25 score first.
+
+    Returns ``(total_matches, [(entry_id, score), ...])`` for the requested page.
+    """
+    terms = parse_query(query)
+    stats = conn.execute("SELECT docs, total_length FROM journal_index_stats WHERE id = 1").fetchone()
+    if not terms or not stats or not stats[0]:
+        return 0, []
+    docs, total_length = stats
+    avgdl = total_length / docs or 1.0
+
+    # Per query term: [(idf, {entry_id: tf})] for each index term it expands to
+    matched = []
+    candidates = None
+    for term, prefix in terms:
+        expansions = list(_postings(conn, term, prefix).values())
+        entries = set().union(*expansions)
+        # AND semantics: keep entries that matched every term so far
+        candidates = entries if candidates is None else candidates & entries
+        if not candidates:
+            return 0, []
+        matched.append([(_idf(docs, len(postings)), postings) for postings in expansions])
+
+    lengths = {}
+    ids = list(candidates)
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        lengths.update(conn.execute(
+            f"SELECT entry_id, length FROM journal_doclen WHERE entry_id IN ({','.join('?' * len(chunk))})", chunk
+        ).fetchall())
+
+    ranked = []
+    for entry_id in candidates:
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths.get(entry_id, avgdl) / avgdl)
+        score = 0.0
+        for expansions in matched:
+            for idf, postings in expansions:
+                tf = postings.get(entry_id)
+                if tf:
+                    score += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        ranked.append((score, entry_id))
+    ranked.sort(key=lambda r: (-r[0], -r[1]))
+
+    start = (max(page, 1) - 1) * page_size
+    return len(ranked), [(entry_id, score) for score, entry_id in ranked[start:start + page_size]]
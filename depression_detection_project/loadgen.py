@@ -0,0 +1,83 @@
+"""Load generator for serve.py: throughput vs tail latency on one box.
+
+Runs a closed loop of ``--concurrency`` keep-alive clients, each sending
+single-text ``POST /score`` requests back to back for ``--duration``
+seconds. Pass several concurrency levels to get one row per level.
+
+    python serve.py &
+    python loadgen.py --concurrency 1 8 32 128 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+from benchmark import synthetic_posts
+from serve import HOST, PORT
+
+
+async def _client(host, port, bodies, stop_at, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < stop_at:
+            body = random.choice(bodies)
+            request = (
+                f"POST /score HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n"
+            ).encode("latin-1") + body
+            started = time.perf_counter()
+            writer.write(request)
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                # Back off like a well-behaved client honouring Retry-After
+                await asyncio.sleep(0.05)
+    finally:
+        writer.close()
+
+
+async def run_level(host, port, concurrency, duration, bodies):
+    latencies, statuses = [], {}
+    started = time.perf_counter()
+    stop_at = started + duration
+    await asyncio.gather(*(_client(host, port, bodies, stop_at, latencies, statuses) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "concurrency": concurrency,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "rejected": sum(n for status, n in statuses.items() if status != 200),
+    }
+
+
+async def main(args):
+    bodies = [json.dumps({"text": text}).encode("utf-8") for text, _ in synthetic_posts(1000, seed=7)]
+    print(f"{'conc':>6} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'rejected':>9}")
+    for concurrency in args.concurrency:
+        r = await run_level(args.host, args.port, concurrency, args.duration, bodies)
+        print(f"{r['concurrency']:>6} {r['rps']:>10,.0f} {r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['rejected']:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure serve.py throughput and latency.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per concurrency level")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,169 @@
+"""Process-wide timers, counters and latency histograms.
+
+Every Streamlit session runs in a thread of the same server process, so one
+registry (guarded by a lock) aggregates all of them. ``export`` writes the
+registry both as Prometheus text (for a node-exporter textfile collector or
+a scrape sidecar) and as JSON.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+METRICS_DIR = "metrics"
+PROM_PATH = os.path.join(METRICS_DIR, "metrics.prom")
+JSON_PATH = os.path.join(METRICS_DIR, "metrics.json")
+EXPORT_INTERVAL = 5.0
+
+# Seconds; the last bucket is +Inf
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PREFIX = "wellness_"
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_startup = set()
+_last_export = 0.0
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (Prometheus-style estimate)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS + (float("inf"),), self.buckets):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+# -------------------------
+# Recording
+# -------------------------
+def observe(name, seconds, **labels):
+    with _lock:
+        _histograms.setdefault(_key(name, labels), Histogram()).observe(seconds)
+
+
+def inc(name, value=1, **labels):
+    with _lock:
+        key = _key(name, labels)
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def record_startup(phase, seconds):
+    """Record ``startup_seconds{phase=...}`` once per process; later calls (warm reruns) are ignored."""
+    with _lock:
+        if phase in _startup:
+            return False
+        _startup.add(phase)
+        _histograms.setdefault(_key("startup_seconds", {"phase": phase}), Histogram()).observe(seconds)
+    return True
+
+
+@contextmanager
+def timer(name, **labels):
+    """Time the ``with`` block into histogram ``name`` (also on error)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+
+def timed(op):
+    """Decorator: time every call into the ``op_duration_seconds{op=...}`` histogram."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer("op_duration_seconds", op=op):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# -------------------------
+# Export
+# -------------------------
+def _labels(pairs, extra=()):
+    pairs = tuple(pairs) + tuple(extra)
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}" if pairs else ""
+
+
+def to_prometheus():
+    with _lock:
+        histograms = {k: (list(h.buckets), h.count, h.sum) for k, h in _histograms.items()}
+        counters = dict(_counters)
+    lines = []
+    for name in sorted({n for n, _ in histograms}):
+        lines.append(f"# TYPE {PREFIX}{name} histogram")
+        for (n, labels), (buckets, count, total) in sorted(histograms.items()):
+            if n != name:
+                continue
+            cumulative = 0
+            for bound, c in zip(BUCKETS + ("+Inf",), buckets):
+                cumulative += c
+                lines.append(f"{PREFIX}{name}_bucket{_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{PREFIX}{name}_count{_labels(labels)} {count}")
+    for name in sorted({n for n, _ in counters}):
+        lines.append(f"# TYPE {PREFIX}{name} counter")
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{PREFIX}{name}{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def to_json():
+    with _lock:
+        return {
+            "histograms": [
+                {"name": n, "labels": dict(labels), "count": h.count, "sum": h.sum,
+                 "p50": h.quantile(0.5), "p95": h.quantile(0.95), "p99": h.quantile(0.99),
+                 "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], h.buckets))}
+                for (n, labels), h in sorted(_histograms.items())
+            ],
+            "counters": [
+                {"name": n, "labels": dict(labels), "value": v} for (n, labels), v in sorted(_counters.items())
+            ],
+        }
+
+
+def _write_atomic(path, text):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def export(min_interval=EXPORT_INTERVAL):
+    """Write both metrics files, at most once per ``min_interval`` seconds."""
+    global _last_export
+    now = time.monotonic()
+    with _lock:
+        if now - _last_export < min_interval:
+            return False
+        _last_export = now
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    _write_atomic(PROM_PATH, to_prometheus())
+    _write_atomic(JSON_PATH, json.dumps({"generated": time.time(), **to_json()}, indent=2, default=str))
+    return True
@@ -0,0 +1,179 @@
+"""Process-wide model handle shared by every app session.
+
+The handle loads the scorer once, can be warmed up front, and swaps in a
+newly trained artifact when the files on disk change, without a restart.
+Readers never block: a reload builds the new scorer first and then replaces
+the reference in one assignment.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import threading
+
+import numpy as np
+
+from fast_scorer import FAST_MODEL_PATH, FastScorer, top_terms
+from preprocess import clean_text
+from score_cache import ScoreCache, digest
+
+MODEL_PATH = "model.pkl"
+VECTORIZER_PATH = "vectorizer.pkl"
+
+WARMUP_TEXTS = ["warming up the model", "I feel tired and alone lately"]
+
+log = logging.getLogger(__name__)
+
+
+class SklearnScorer:
+    """Fallback for when no folded artifact exists (e.g. a hashing-vectorizer model)."""
+
+    def __init__(self, model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH):
+        with open(model_path, "rb") as f:
+            self.model = pickle.load(f)
+        with open(vectorizer_path, "rb") as f:
+            self.vectorizer = pickle.load(f)
+        self.positive_col = list(self.model.classes_).index(1)
+
+    def predict_proba(self, texts):
+        features = self.vectorizer.transform(list(texts))
+        return self.model.predict_proba(features)[:, self.positive_col]
+
+    def explain(self, texts, top=3):
+        """Like ``FastScorer.explain``: one sparse transform, contributions ``x_j * coef_j``."""
+        features = self.vectorizer.transform(list(texts)).tocsr()
+        probs = self.model.predict_proba(features)[:, self.positive_col]
+        if not hasattr(self.vectorizer, "get_feature_names_out"):
+            # Hashed features can't be mapped back to terms
+            return probs, [[] for _ in range(features.shape[0])]
+        coef = np.asarray(self.model.coef_[0], dtype=np.float64)
+        if self.positive_col != 1:
+            coef = -coef
+        contrib = features.multiply(coef).tocsr()
+        names = self.vectorizer.get_feature_names_out()
+        return probs, top_terms(contrib.indptr, contrib.indices, contrib.data, names, top)
+
+
+def _file_digest(paths):
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+class ModelHandle:
+    def __init__(self, fast_path=FAST_MODEL_PATH, model_path=MODEL_PATH, vectorizer_path=VECTORIZER_PATH, cache=None):
+        self.fast_path = fast_path
+        self.model_path = model_path
+        self.vectorizer_path = vectorizer_path
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._scorer = None
+        self._loaded = (None, None)
+        self._fingerprint = None
+        self.version = None
+        self.backend = None
+        self.load()
+
+    def _artifacts(self):
+        if os.path.exists(self.fast_path):
+            return "fast", [self.fast_path]
+        return "sklearn", [self.model_path, self.vectorizer_path]
+
+    def _stat(self):
+        _, paths = self._artifacts()
+        return tuple((p, os.stat(p).st_mtime_ns, os.stat(p).st_size) for p in paths)
+
+    def load(self):
+        """(Re)load the scorer from disk and swap it in."""
+        with self._lock:
+            backend, paths = self._artifacts()
+            fingerprint = self._stat()
+            if backend == "fast":
+                scorer = FastScorer(self.fast_path)
+            else:
+                scorer = SklearnScorer(self.model_path, self.vectorizer_path)
+            version = _file_digest(paths)
+            scorer.predict_proba(WARMUP_TEXTS)
+            self._scorer, self._fingerprint = scorer, fingerprint
+            self.version, self.backend = version, backend
+            # One reference, so a concurrent reader never pairs the new scorer with the old version
+            self._loaded = (scorer, version)
+            if self.cache is not None:
+                self.cache.retain(version)
+
+    def reload_if_changed(self):
+        """Reload when the artifact was retrained since the last load. Returns True on swap."""
+        try:
+            changed = self._stat() != self._fingerprint
+        except FileNotFoundError:
+            # Mid-write by train.py; keep serving the current model
+            return False
+        if not changed:
+            return False
+        try:
+            self.load()
+        except Exception:
+            # Half-written or broken artifact; keep serving the current model and retry next time
+            log.warning("Model reload failed; keeping version %s", self.version, exc_info=True)
+            return False
+        return True
+
+    def predict_proba(self, texts):
+        """P(depressed) for each text, after the same cleaning used for training."""
+        return self.predict_proba_versioned(texts)[0]
+
+    def predict_proba_versioned(self, texts):
+        """``(probabilities, version)`` where ``version`` names the model that produced them."""
+        scorer, version = self._loaded
+        texts = [clean_text(str(t)) for t in texts]
+        if not texts:
+            return np.empty(0), version
+        if self.cache is None:
+            return np.asarray(scorer.predict_proba(texts), dtype=np.float64), version
+
+        digests = [digest(t) for t in texts]
+        known = self.cache.get_many(digests, version)
+        todo = {d: t for d, t in zip(digests, texts) if d not in known}
+        if todo:
+            fresh = dict(zip(todo, scorer.predict_proba(list(todo.values()))))
+            self.cache.put_many(fresh, version)
+            known.update(fresh)
+        return np.array([known[d] for d in digests], dtype=np.float64), version
+
+    def explain(self, texts, top=3):
+        """``(P(depressed) per text, top terms per text)`` in one batched pass; bypasses the score cache.
+
+        Terms are ``(term, logit contribution)`` pairs, the ones pushing hardest towards "depressed" first.
+        """
+        scorer, _ = self._loaded
+        texts = [clean_text(str(t)) for t in texts]
+        if not texts:
+            return np.empty(0), []
+        probs, terms = scorer.explain(texts, top)
+        return np.asarray(probs, dtype=np.float64), terms
+
+    def risk_score(self, text):
+        """Depression risk of one text as a percentage 0..100."""
+        return round(float(self.predict_proba([text])[0]) * 100, 1)
+
+
+_handle = None
+_handle_lock = threading.Lock()
+
+
+def get_model_handle():
+    """The process-wide ``ModelHandle``, created and warmed on first use."""
+    global _handle
+    if _handle is None:
+        with _handle_lock:
+            if _handle is None:
+                _handle = ModelHandle(cache=ScoreCache())
+    return _handle
+
+
+def loaded_handle():
+    """The process-wide ``ModelHandle`` if something already loaded it, else None (never loads)."""
+    return _handle
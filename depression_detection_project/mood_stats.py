@@ -0,0 +1,187 @@
+"""Incrementally maintained mood aggregates.
+
+Every mood upsert updates these tables in the same transaction, so pages read
+averages and streaks with a couple of indexed lookups instead of reloading
+and re-scanning the whole history:
+
+- ``mood_summary``: last-7 / last-30 entry averages and the entry count
+- ``mood_periods``: running totals per ISO week and per month
+- ``mood_runs``: consecutive-day runs, for logging streaks ("logged") and
+  low-mood streaks ("low", mood <= LOW_MOOD)
+"""
+import datetime as dt
+
+LOW_MOOD = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mood_summary (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    avg7 REAL,
+    avg30 REAL,
+    entries INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS mood_periods (
+    kind TEXT NOT NULL,
+    period TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (kind, period)
+);
+CREATE TABLE IF NOT EXISTS mood_runs (
+    kind TEXT NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    PRIMARY KEY (kind, start)
+);
+CREATE INDEX IF NOT EXISTS mood_runs_end ON mood_runs (kind, end);
+CREATE INDEX IF NOT EXISTS mood_runs_length ON mood_runs (kind, length);
+"""
+
+
+def _periods(date):
+    year, week, _ = date.isocalendar()
+    return {"week": f"{year}-W{week:02d}", "month": date.strftime("%Y-%m")}
+
+
+def _shift(date_str, days):
+    return (dt.date.fromisoformat(date_str) + dt.timedelta(days=days)).isoformat()
+
+
+# -------------------------
+# Runs of consecutive days
+# -------------------------
+def _add_day(conn, kind, day):
+    before = conn.execute(
+        "SELECT start, length FROM mood_runs WHERE kind = ? AND end = ?", (kind, _shift(day, -1))
+    ).fetchone()
+    after = conn.execute(
+        "SELECT end, length FROM mood_runs WHERE kind = ? AND start = ?", (kind, _shift(day, 1))
+    ).fetchone()
+    if after:
+        conn.execute("DELETE FROM mood_runs WHERE kind = ? AND start = ?", (kind, _shift(day, 1)))
+    start = before[0] if before else day
+    end = after[0] if after else day
+    length = (before[1] if before else 0) + 1 + (after[1] if after else 0)
+    conn.execute(
+        "INSERT OR REPLACE INTO mood_runs (kind, start, end, length) VALUES (?, ?, ?, ?)",
+        (kind, start, end, length),
+    )
+
+
+def _remove_day(conn, kind, day):
+    run = _run_containing(conn, kind, day)
+    if run is None:
+        return
+    start, end, length = run
+    conn.execute("DELETE FROM mood_runs WHERE kind = ? AND start = ?", (kind, start))
+    left = (dt.date.fromisoformat(day) - dt.date.fromisoformat(start)).days
+    if left:
+        conn.execute(
+            "INSERT INTO mood_runs (kind, start, end, length) VALUES (?, ?, ?, ?)",
+            (kind, start, _shift(day, -1), left),
+        )
+    if length - left - 1:
+        conn.execute(
+            "INSERT INTO mood_runs (kind, start, end, length) VALUES (?, ?, ?, ?)",
+            (kind, _shift(day, 1), end, length - left - 1),
+        )
+
+
+def _run_containing(conn, kind, day):
+    run = conn.execute(
+        "SELECT start, end, length FROM mood_runs WHERE kind = ? AND start <= ? ORDER BY start DESC LIMIT 1",
+        (kind, day),
+    ).fetchone()
+    return run if run and run[1] >= day else None
+
+
+# -------------------------
+# Maintenance (called by storage inside its write transaction)
+# -------------------------
+def apply_mood_change(conn, date_str, old_score, new_score):
+    """Fold one upsert of ``date_str`` (``old_score`` is None for a new day) into the aggregates."""
+    for kind, period in _periods(dt.date.fromisoformat(date_str)).items():
+        delta = new_score - (old_score or 0)
+        conn.execute(
+            "INSERT INTO mood_periods (kind, period, total, count) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (kind, period) DO UPDATE SET total = total + excluded.total, count = count + excluded.count",
+            (kind, period, delta, 0 if old_score is not None else 1),
+        )
+
+    if old_score is None:
+        _add_day(conn, "logged", date_str)
+    was_low = old_score is not None and old_score <= LOW_MOOD
+    is_low = new_score <= LOW_MOOD
+    if is_low and not was_low:
+        _add_day(conn, "low", date_str)
+    elif was_low and not is_low:
+        _remove_day(conn, "low", date_str)
+
+    _refresh_summary(conn, 1 if old_score is None else 0)
+
+
+def _refresh_summary(conn, new_entries):
+    # The newest 30 rows via the date primary key: bounded work whatever the history length
+    recent = [r[0] for r in conn.execute("SELECT mood_score FROM moods ORDER BY date DESC LIMIT 30")]
+    avg7 = sum(recent[:7]) / len(recent[:7]) if recent else None
+    avg30 = sum(recent) / len(recent) if recent else None
+    conn.execute(
+        "INSERT INTO mood_summary (id, avg7, avg30, entries) VALUES (1, ?, ?, ?) "
+        "ON CONFLICT (id) DO UPDATE SET avg7 = excluded.avg7, avg30 = excluded.avg30, "
+        "entries = entries + excluded.entries",
+        (avg7, avg30, new_entries),
+    )
+
+
+def reset(conn):
+    """Empty the aggregates (mood history was cleared)."""
+    conn.execute("DELETE FROM mood_periods")
+    conn.execute("DELETE FROM mood_runs")
+    conn.execute("DELETE FROM mood_summary")
+
+
+def rebuild(conn):
+    """Recompute every aggregate from the ``moods`` table (one-off, for existing databases)."""
+    reset(conn)
+    rows = conn.execute("SELECT date, mood_score FROM moods ORDER BY date").fetchall()
+    for date_str, score in rows:
+        apply_mood_change(conn, date_str, None, score)
+
+
+# -------------------------
+# Reads
+# -------------------------
+def _longest(conn, kind):
+    run = conn.execute(
+        "SELECT start, end, length FROM mood_runs WHERE kind = ? ORDER BY length DESC, start DESC LIMIT 1",
+        (kind,),
+    ).fetchone()
+    return {"start": run[0], "end": run[1], "days": run[2]} if run else None
+
+
+def summary(conn, today=None):
+    """Headline mood metrics; every field is an indexed lookup."""
+    today = (today or dt.date.today()).isoformat()
+    row = conn.execute("SELECT avg7, avg30, entries FROM mood_summary WHERE id = 1").fetchone()
+    avg7, avg30, entries = row if row else (None, None, 0)
+    current = _run_containing(conn, "logged", today)
+    streak = (dt.date.fromisoformat(today) - dt.date.fromisoformat(current[0])).days + 1 if current else 0
+    return {
+        "avg7": avg7,
+        "avg30": avg30,
+        "entries": entries,
+        "streak": streak,
+        "best_streak": _longest(conn, "logged"),
+        "worst_streak": _longest(conn, "low"),
+    }
+
+
+def period_averages(conn, kind, limit=None):
+    """``[(period, average, count)]`` for ``kind`` in ("week", "month"), oldest first."""
+    rows = conn.execute(
+        "SELECT period, CAST(total AS REAL) / count, count FROM mood_periods "
+        "WHERE kind = ? AND count > 0 ORDER BY period DESC LIMIT ?",
+        (kind, -1 if limit is None else limit),
+    ).fetchall()
+    return rows[::-1]
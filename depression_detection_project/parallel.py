@@ -0,0 +1,34 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+def default_workers():
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def bounded_map(fn, items, workers=None, window=None, initializer=None, initargs=()):
+    """Like ``executor.map`` but keeps at most ``window`` tasks in flight.
+
+    ``Executor.map`` (and ``Pool.imap``) drain the whole input up front, which
+    defeats streaming over files larger than memory. Results come back in
+    input order.
+    """
+    workers = workers or default_workers()
+    window = window or workers * 2
+
+    if workers == 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for item in items:
+            yield fn(item)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -1,29 +1,196 @@
-import pickle
-
-# Load saved model and vectorizer
-with open("model.pkl", "rb") as f:
-    model = pickle.load(f)
-
-with open("vectorizer.pkl", "rb") as f:
-    vectorizer = pickle.load(f)
-
-def predict_depression(text):
-    # Convert input text to TF-IDF features
-    text_tfidf = vectorizer.transform([text])
-    
-    # Predict
-    prediction = model.predict(text_tfidf)[0]
-    
-    if prediction == 1:
-        return "⚠️ Depressed"
-    else:
-        return "✅ Not Depressed"
-
-if __name__ == "__main__":
-    # Example inputs
-    while True:
-        user_input = input("\nEnter a social media post (or 'exit' to quit): ")
-        if user_input.lower() == "exit":
-            break
-        result = predict_depression(user_input)
-        print("Prediction:", result)
+import argparse
+import csv
+import json
+import os
+import pickle
+import sys
+import threading
+from collections import deque
+
+import numpy as np
+
+from parallel import bounded_map, default_workers
+from preprocess import clean_text
+
+MODEL_PATH = "model.pkl"
+VECTORIZER_PATH = "vectorizer.pkl"
+
+CHUNK_SIZE = 4096
+TEXT_COLUMNS = ("text", "clean_text")
+
+_loaded = None
+_load_lock = threading.Lock()
+
+
+def load_model():
+    """``(model, vectorizer, positive column)``, unpickled on first use and kept for the process."""
+    global _loaded
+    if _loaded is None:
+        with _load_lock:
+            if _loaded is None:
+                # Load saved model and vectorizer
+                with open(MODEL_PATH, "rb") as f:
+                    model = pickle.load(f)
+                with open(VECTORIZER_PATH, "rb") as f:
+                    vectorizer = pickle.load(f)
+                # Column of predict_proba holding P(is_depression == 1)
+                _loaded = (model, vectorizer, list(model.classes_).index(1))
+    return _loaded
+
+
+def __getattr__(name):
+    # predict.model / predict.vectorizer / predict.POSITIVE_COL still work, they just load lazily
+    if name in ("model", "vectorizer", "POSITIVE_COL"):
+        return load_model()[("model", "vectorizer", "POSITIVE_COL").index(name)]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def predict_depression(text):
+    model, vectorizer, _ = load_model()
+    # Convert input text to TF-IDF features, cleaned the way the training data was
+    text_tfidf = vectorizer.transform([clean_text(text)])
+
+    # Predict
+    prediction = model.predict(text_tfidf)[0]
+
+    if prediction == 1:
+        return "⚠️ Depressed"
+    else:
+        return "✅ Not Depressed"
+
+
+def _score_chunk(texts):
+    # One sparse transform + one predict_proba for the whole chunk; texts are
+    # cleaned exactly like ModelHandle does, so the CLI and the app agree
+    model, vectorizer, positive_col = load_model()
+    features = vectorizer.transform([clean_text("" if t is None else str(t)) for t in texts])
+    return model.predict_proba(features)[:, positive_col]
+
+
+def iter_predict_proba(texts, chunk_size=CHUNK_SIZE):
+    """Yield arrays of P(depressed), one array per chunk of ``chunk_size`` texts."""
+    chunk = []
+    for text in texts:
+        chunk.append(text)
+        if len(chunk) >= chunk_size:
+            yield _score_chunk(chunk)
+            chunk = []
+    if chunk:
+        yield _score_chunk(chunk)
+
+
+def predict_proba_batch(texts, chunk_size=CHUNK_SIZE):
+    """Score an iterable of texts, returning a float array of P(depressed)."""
+    chunks = list(iter_predict_proba(texts, chunk_size))
+    if not chunks:
+        return np.empty(0)
+    return np.concatenate(chunks)
+
+
+# ==========================
+# Streaming CLI
+# ==========================
+def _read_records(stream, fmt):
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _chunked(records, size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _pick_text_column(record, text_column):
+    if text_column:
+        return text_column
+    for name in TEXT_COLUMNS:
+        if name in record:
+            return name
+    raise ValueError(f"Input needs one of the columns {TEXT_COLUMNS} (or pass --text-column)")
+
+
+def score_stream(records, text_column=None, chunk_size=CHUNK_SIZE, workers=None):
+    """Yield ``records`` with ``depression_prob``/``prediction`` added.
+
+    Chunks are scored in a process pool; only a few chunks per worker are held
+    in memory at any time, so arbitrarily large inputs stream through.
+    """
+    in_flight = deque()
+
+    def texts():
+        column = None
+        for chunk in _chunked(records, chunk_size):
+            column = column or _pick_text_column(chunk[0], text_column)
+            in_flight.append(chunk)
+            yield [record.get(column) for record in chunk]
+
+    for probs in bounded_map(_score_chunk, texts(), workers=workers):
+        for record, prob in zip(in_flight.popleft(), probs):
+            record["depression_prob"] = round(float(prob), 6)
+            record["prediction"] = int(prob >= 0.5)
+            yield record
+
+
+def _write_records(records, stream, fmt):
+    writer = None
+    for record in records:
+        if fmt == "csv":
+            if writer is None:
+                writer = csv.DictWriter(stream, fieldnames=list(record))
+                writer.writeheader()
+            writer.writerow(record)
+        else:
+            stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _guess_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    return "csv" if ext == ".csv" else "jsonl"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score social media posts for depressive language.")
+    parser.add_argument("input", nargs="?", help="CSV/JSONL file to score, or '-' for stdin (omit for interactive mode)")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="input/output format (default: from file extension)")
+    parser.add_argument("--text-column", help=f"field holding the text (default: first of {', '.join(TEXT_COLUMNS)})")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="texts per sparse transform")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="scoring processes")
+    args = parser.parse_args(argv)
+
+    if args.input is None:
+        # Example inputs
+        while True:
+            user_input = input("\nEnter a social media post (or 'exit' to quit): ")
+            if user_input.lower() == "exit":
+                break
+            result = predict_depression(user_input)
+            print("Prediction:", result)
+        return
+
+    fmt = args.format or ("jsonl" if args.input == "-" else _guess_format(args.input))
+    src = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        scored = score_stream(_read_records(src, fmt), args.text_column, args.chunk_size, args.workers)
+        _write_records(scored, dst, fmt)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,155 @@
-import pandas as pd
-import re
-import string
-import os
-
-# File path
-DATA_PATH = "dataset/depression_dataset_reddit_cleaned.csv"
-
-def clean_text(text):
-    # Lowercase
-    text = text.lower()
-    # Remove URLs
-    text = re.sub(r"http\S+|www\S+|https\S+", '', text, flags=re.MULTILINE)
-    # Remove punctuation
-    text = text.translate(str.maketrans('', '', string.punctuation))
-    # Remove numbers
-    text = re.sub(r'\d+', '', text)
-    # Remove extra spaces
-    text = text.strip()
-    return text
-
-def load_and_preprocess():
-    # Load dataset
-    df = pd.read_csv(DATA_PATH)
-
-    # Check columns
-    if not {'clean_text', 'is_depression'}.issubset(df.columns):
-        raise ValueError("Dataset must contain 'clean_text' and 'is_depression' columns")
-
-    # Keep only required columns
-    df = df[['clean_text', 'is_depression']]
-
-    # Clean text
-    df['clean_text'] = df['clean_text'].astype(str).apply(clean_text)
-
-    # Save processed dataset
-    processed_path = "dataset/processed_depression.csv"
-    os.makedirs("dataset", exist_ok=True)
-    df.to_csv(processed_path, index=False)
-
-    print(f"✅ Preprocessing complete. Saved at: {processed_path}")
-    print(df.head())
-    return processed_path
-
-if __name__ == "__main__":
-    load_and_preprocess()
+import argparse
+import json
+import os
+import re
+import string
+import time
+
+import dataset
+from dataset import COLUMNS
+from parallel import bounded_map, default_workers
+
+# File path
+DATA_PATH = "dataset/depression_dataset_reddit_cleaned.csv"
+PROCESSED_PATH = "dataset/processed_depression.csv"
+CHUNK_SIZE = 5000
+# Same as dedup.THRESHOLD; dedup (and NumPy) is only imported when deduplicating,
+# since every clean_text user imports this module
+DEDUP_THRESHOLD = 0.8
+
+# Compiled once per process instead of on every clean_text call
+URL_RE = re.compile(r"http\S+|www\S+|https\S+", flags=re.MULTILINE)
+DIGITS_RE = re.compile(r'\d+')
+PUNCT_TABLE = str.maketrans('', '', string.punctuation)
+
+
+def clean_text(text):
+    # Lowercase
+    text = text.lower()
+    # Remove URLs
+    text = URL_RE.sub('', text)
+    # Remove punctuation
+    text = text.translate(PUNCT_TABLE)
+    # Remove numbers
+    text = DIGITS_RE.sub('', text)
+    # Remove extra spaces
+    text = text.strip()
+    return text
+
+
+def _clean_chunk(df):
+    # Runs in a worker process; returns the chunk already serialized so the
+    # parent only has to append bytes to the output file
+    df = df[COLUMNS].copy()
+    df['clean_text'] = df['clean_text'].astype(str).map(clean_text)
+    return len(df), df.to_csv(index=False, header=False).encode("utf-8")
+
+
+# ==========================
+# Resumable checkpoints
+# ==========================
+def _source_stamp(path, chunk_size):
+    stat = os.stat(path)
+    return {"source": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "chunk_size": chunk_size}
+
+
+def _load_checkpoint(progress_path, stamp):
+    try:
+        with open(progress_path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # Only resume work done on the very same input with the same chunking
+    return state if state.get("stamp") == stamp else None
+
+
+def _save_checkpoint(progress_path, stamp, rows, offset):
+    tmp = progress_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"stamp": stamp, "rows": rows, "offset": offset}, f)
+    os.replace(tmp, progress_path)
+
+
+# ==========================
+# Pipeline
+# ==========================
+def preprocess_file(src=DATA_PATH, dst=PROCESSED_PATH, chunk_size=CHUNK_SIZE, workers=None, resume=True):
+    """Stream ``src`` through ``clean_text`` in parallel chunks into ``dst``.
+
+    Output goes to ``dst + ".partial"`` and is renamed into place when done.
+    A checkpoint after every chunk lets an interrupted run pick up where it
+    stopped instead of starting over.
+    """
+    partial_path = dst + ".partial"
+    progress_path = dst + ".progress"
+    stamp = _source_stamp(src, chunk_size)
+    state = _load_checkpoint(progress_path, stamp) if resume and os.path.exists(partial_path) else None
+    rows_done, offset = (state["rows"], state["offset"]) if state else (0, 0)
+
+    header, _ = dataset.read_schema(src)
+    if not set(COLUMNS).issubset(header):
+        raise ValueError("Dataset must contain 'clean_text' and 'is_depression' columns")
+
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    if rows_done:
+        print(f"↻ Resuming after {rows_done} rows")
+    reader = dataset.iter_batches(src, COLUMNS, chunk_size, skip_rows=rows_done)
+
+    started = time.perf_counter()
+    rows = 0
+    with open(partial_path, "r+b" if rows_done else "wb") as out:
+        # Drop anything written after the last checkpoint
+        out.seek(offset)
+        out.truncate()
+        if not rows_done:
+            out.write((",".join(COLUMNS) + "\n").encode("utf-8"))
+
+        for n, data in bounded_map(_clean_chunk, reader, workers=workers):
+            out.write(data)
+            out.flush()
+            os.fsync(out.fileno())
+            rows += n
+            _save_checkpoint(progress_path, stamp, rows_done + rows, out.tell())
+            elapsed = time.perf_counter() - started
+            print(f"  {rows_done + rows} rows cleaned ({rows / elapsed:,.0f} rows/s)")
+
+    os.replace(partial_path, dst)
+    os.remove(progress_path)
+    elapsed = time.perf_counter() - started
+    print(f"⏱️ {rows} rows in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:,.0f} rows/s)")
+    return dst
+
+
+def load_and_preprocess(workers=None, chunk_size=CHUNK_SIZE, resume=True, arrow=False, dedup_threshold=DEDUP_THRESHOLD):
+    processed_path = preprocess_file(dataset.resolve(DATA_PATH), PROCESSED_PATH, chunk_size, workers, resume)
+    if dedup_threshold:
+        import dedup
+
+        # Boilerplate posts (check-ins, rules, ads) recur with small edits; keep one of each
+        dedup.dedup_file(processed_path, threshold=dedup_threshold, workers=workers)
+        print(f"📄 Dedup report saved at: {dedup.REPORT_PATH}")
+
+    print(f"✅ Preprocessing complete. Saved at: {processed_path}")
+    print(next(dataset.iter_batches(processed_path, batch_size=5)))
+    if arrow:
+        # Columnar copy for train.py --out-of-core, picked up automatically by dataset.resolve()
+        dataset.convert_csv(processed_path)
+    return processed_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean the Reddit depression dataset for training.")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows per chunk")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="cleaning processes")
+    parser.add_argument("--restart", action="store_true", help="ignore any checkpoint and start over")
+    parser.add_argument("--arrow", action="store_true", help="also write a columnar .arrow copy (needs pyarrow)")
+    parser.add_argument("--dedup-threshold", type=float, default=DEDUP_THRESHOLD,
+                        help="MinHash Jaccard similarity above which posts count as near-duplicates")
+    parser.add_argument("--no-dedup", action="store_true", help="keep near-duplicate posts")
+    args = parser.parse_args()
+    if args.arrow and not dataset.arrow_available():
+        parser.error("--arrow needs pyarrow: pip install pyarrow")
+    if not 0 < args.dedup_threshold <= 1:
+        parser.error("--dedup-threshold must be in (0, 1]")
+    load_and_preprocess(args.workers, args.chunk_size, resume=not args.restart, arrow=args.arrow,
+                        dedup_threshold=None if args.no_dedup else args.dedup_threshold)
@@ -0,0 +1,148 @@
+"""Content-addressed cache of model scores.
+
+Keys are the SHA-1 of the ``clean_text``-normalized input plus the model
+version, so the same post pasted twice (or differing only in case, URLs or
+punctuation) is scored once per model. A small in-memory LRU sits in front
+of a size-bounded SQLite table that survives restarts; when a new model is
+loaded, rows from other versions are dropped.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+
+CACHE_PATH = os.path.join("cache", "scores.db")
+MEMORY_ENTRIES = 4096
+DISK_ENTRIES = 200000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    digest TEXT NOT NULL,
+    version TEXT NOT NULL,
+    score REAL NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (digest, version)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scores_used ON scores (used);
+"""
+
+
+def digest(cleaned):
+    return hashlib.sha1(cleaned.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    def __init__(self, path=CACHE_PATH, memory_entries=MEMORY_ENTRIES, disk_entries=DISK_ENTRIES):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._inserts = 0
+        # Memory hits since the last trim; their disk rows are marked used before evicting
+        self._touched = {}
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def get_many(self, digests, version):
+        """``{digest: score}`` for the digests cached under ``version``."""
+        found, missing = {}, []
+        now = time.time()
+        with self._lock:
+            for d in digests:
+                score = self._memory.get((d, version))
+                if score is None:
+                    missing.append(d)
+                else:
+                    self._memory.move_to_end((d, version))
+                    self._touched[(d, version)] = now
+                    found[d] = score
+            self.hits["memory"] += len(found)
+            from_disk = {}
+            for d in dict.fromkeys(missing):
+                row = self._conn.execute(
+                    "SELECT score FROM scores WHERE digest = ? AND version = ?", (d, version)
+                ).fetchone()
+                if row:
+                    from_disk[d] = row[0]
+            if from_disk:
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE scores SET used = ? WHERE digest = ? AND version = ?",
+                        ((now, d, version) for d in from_disk),
+                    )
+                for d, score in from_disk.items():
+                    self._remember((d, version), score)
+            disk_hits = sum(1 for d in missing if d in from_disk)
+            self.hits["disk"] += disk_hits
+            self.misses += len(missing) - disk_hits
+        for result, n in (("memory", len(found)), ("disk", disk_hits), ("miss", len(missing) - disk_hits)):
+            if n:
+                metrics.inc("score_cache_lookups_total", n, result=result)
+        found.update(from_disk)
+        return found
+
+    def put_many(self, scores, version):
+        """Store ``{digest: score}`` produced by ``version``."""
+        now = time.time()
+        with self._lock:
+            for d, score in scores.items():
+                self._remember((d, version), score)
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO scores (digest, version, score, used) VALUES (?, ?, ?, ?)",
+                    ((d, version, float(score), now) for d, score in scores.items()),
+                )
+                self._inserts += len(scores)
+                # Trimming needs a COUNT, so only check every few hundred inserts
+                if self._inserts >= max(self.disk_entries // 100, 1):
+                    self._inserts = 0
+                    self._evict()
+
+    def retain(self, version):
+        """Drop everything not produced by ``version`` (called after a model swap)."""
+        with self._lock:
+            self._memory = OrderedDict((k, v) for k, v in self._memory.items() if k[1] == version)
+            self._touched.clear()
+            with self._conn:
+                self._conn.execute("DELETE FROM scores WHERE version != ?", (version,))
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits["memory"] + self.hits["disk"] + self.misses
+            return {
+                **{f"{k}_hits": v for k, v in self.hits.items()},
+                "misses": self.misses,
+                "hit_rate": (lookups - self.misses) / lookups if lookups else None,
+                "memory_entries": len(self._memory),
+            }
+
+    def _remember(self, key, score):
+        self._memory[key] = score
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        # Least recently used rows go first; trim to 90% so this doesn't run on every insert
+        self._conn.executemany(
+            "UPDATE scores SET used = ? WHERE digest = ? AND version = ?",
+            ((used, d, version) for (d, version), used in self._touched.items()),
+        )
+        self._touched.clear()
+        count = self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+        if count > self.disk_entries:
+            excess = count - int(self.disk_entries * 0.9)
+            self._conn.execute(
+                "DELETE FROM scores WHERE (digest, version) IN "
+                "(SELECT digest, version FROM scores ORDER BY used LIMIT ?)", (excess,)
+            )
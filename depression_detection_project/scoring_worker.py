@@ -0,0 +1,97 @@
+"""Background risk scoring for journal entries.
+
+Saving an entry only queues its store; a daemon thread scores every entry
+the current model hasn't scored yet, in batches, and persists the score and
+model version with the row. When a new model is deployed each store's
+backlog is picked up again the next time that store is used, so history
+views read stored scores instead of rescoring on every render.
+"""
+import logging
+import queue
+import threading
+
+import metrics
+
+BATCH_SIZE = 256
+
+log = logging.getLogger(__name__)
+
+
+class ScoringWorker:
+    def __init__(self, handle, batch_size=BATCH_SIZE):
+        self.handle = handle
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = set()
+        # (store path, model version) pairs whose backlog was already queued
+        self._swept = set()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = threading.Thread(target=self._run, name="journal-scoring", daemon=True)
+        self._thread.start()
+
+    def submit(self, store):
+        """Queue ``store`` for scoring; a store already waiting is not queued twice."""
+        with self._lock:
+            if store.path in self._pending:
+                return
+            self._pending.add(store.path)
+            self._idle.clear()
+        self._queue.put(store)
+
+    def ensure_scored(self, store):
+        """Queue ``store`` once per model version (cheap to call on every rerun)."""
+        key = (store.path, self.handle.version)
+        with self._lock:
+            if key in self._swept:
+                return
+            self._swept.add(key)
+        self.submit(store)
+
+    def wait(self, timeout=None):
+        """Block until the queue is drained; True unless ``timeout`` ran out."""
+        return self._idle.wait(timeout)
+
+    def score_backlog(self, store):
+        """Score everything ``store`` holds that the current model hasn't; returns the count."""
+        scored = 0
+        while True:
+            rows = store.unscored_journal(self.handle.version, self.batch_size)
+            if not rows:
+                return scored
+            with metrics.timer("scoring_batch_seconds"):
+                probs, version = self.handle.predict_proba_versioned([text or "" for _, text in rows])
+            store.set_journal_scores(
+                {entry_id: round(float(p) * 100, 1) for (entry_id, _), p in zip(rows, probs)}, version
+            )
+            scored += len(rows)
+            metrics.inc("entries_scored_total", len(rows))
+
+    def _run(self):
+        while True:
+            store = self._queue.get()
+            with self._lock:
+                self._pending.discard(store.path)
+            try:
+                self.score_backlog(store)
+            except Exception:
+                # Keep the worker alive; the entries stay unscored and are retried on the next submit
+                log.exception("Scoring journal entries in %s failed", store.path)
+                metrics.inc("scoring_errors_total")
+            with self._lock:
+                if not self._pending:
+                    self._idle.set()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_scoring_worker(handle):
+    """The process-wide ``ScoringWorker``, started on first use."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = ScoringWorker(handle)
+        return _worker
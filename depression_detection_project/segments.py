@@ -0,0 +1,107 @@
+"""Long-text mode: split a text into segments and score them in batches.
+
+One number for a whole essay or pasted thread hides where the worrying
+parts are. Here the text is cut into sentences (short ones merged with the
+next) or into sliding word windows, and every batch of segments goes
+through the model in a single sparse pass. ``iter_scores`` yields each
+batch as soon as it is scored, starting small so the first results show
+quickly.
+
+Latency stays bounded for very long inputs: past ``MAX_SEGMENTS`` the
+windows grow so the segment count stays fixed, and text beyond
+``MAX_WORDS`` is not scored.
+"""
+import math
+import re
+
+MODES = ("auto", "sentences", "windows")
+MIN_WORDS = 5
+WINDOW_WORDS = 40
+MAX_SEGMENTS = 400
+MAX_WORDS = 100000
+FIRST_BATCH = 16
+MAX_BATCH = 256
+TOP_TERMS = 3
+
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+|\s*\n\s*")
+
+
+def sentences(text, min_words=MIN_WORDS):
+    """Sentences and line breaks of ``text``; fragments under ``min_words`` words join the next one."""
+    out, pending = [], ""
+    for part in SENTENCE_END_RE.split(text):
+        pending = f"{pending} {part}".strip() if pending else part.strip()
+        if len(pending.split()) >= min_words:
+            out.append(pending)
+            pending = ""
+    if pending:
+        if out:
+            out[-1] = f"{out[-1]} {pending}"
+        else:
+            out.append(pending)
+    return out
+
+
+def windows(words, size=WINDOW_WORDS, stride=None):
+    """Word windows of ``size`` words every ``stride`` words (default: half-overlapping)."""
+    stride = stride or max(1, size // 2)
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    starts = list(range(0, len(words) - size + 1, stride))
+    if starts[-1] + size < len(words):
+        starts.append(len(words) - size)
+    return [" ".join(words[i:i + size]) for i in starts]
+
+
+def split_segments(text, mode="auto", max_segments=MAX_SEGMENTS, max_words=MAX_WORDS):
+    """``(segments, truncated)`` for ``text``; ``truncated`` is True when words past ``max_words`` were dropped.
+
+    ``auto`` uses sentences and falls back to windows when there would be
+    more than ``max_segments`` of them.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+    words = text.split()
+    truncated = len(words) > max_words
+    if truncated:
+        words = words[:max_words]
+        text = " ".join(words)
+
+    if mode in ("auto", "sentences"):
+        parts = sentences(text)
+        if mode == "sentences" or len(parts) <= max_segments:
+            # Very long inputs of short sentences: merge neighbours to stay within the budget
+            group = math.ceil(len(parts) / max_segments) if parts else 1
+            return [" ".join(parts[i:i + group]) for i in range(0, len(parts), group)], truncated
+
+    # Windows grow with the input so their count, and the work per word, stay bounded
+    size = max(WINDOW_WORDS, math.ceil(len(words) / max(1, max_segments // 2)))
+    return windows(words, size), truncated
+
+
+def iter_scores(handle, segments, top=TOP_TERMS, first_batch=FIRST_BATCH, max_batch=MAX_BATCH):
+    """Yield lists of scored segments, one list per batched model pass, in order.
+
+    Each scored segment is a dict with ``segment`` (1-based), ``risk``
+    (0..100), ``words``, ``terms`` (top contributing terms) and ``text``.
+    """
+    start, size = 0, first_batch
+    while start < len(segments):
+        batch = segments[start:start + size]
+        probs, terms = handle.explain(batch, top)
+        yield [
+            {"segment": start + k + 1, "risk": round(float(p) * 100, 1), "words": len(text.split()),
+             "terms": [term for term, _ in t], "text": text}
+            for k, (text, p, t) in enumerate(zip(batch, probs, terms))
+        ]
+        start += len(batch)
+        size = min(size * 2, max_batch)
+
+
+def summarize(scored):
+    """Word-weighted mean risk, peak risk and the 1-based peak segment of ``scored``."""
+    if not scored:
+        return None, None, None
+    words = sum(s["words"] for s in scored) or 1
+    peak = max(scored, key=lambda s: s["risk"])
+    return round(sum(s["risk"] * s["words"] for s in scored) / words, 1), peak["risk"], peak["segment"]
@@ -0,0 +1,255 @@
+"""Standalone HTTP scoring service for the predict.py model.
+
+Concurrent single-text requests are coalesced into micro-batches: the first
+request opens a window of ``--batch-window-ms``, everything that arrives
+before it closes (up to ``--max-batch`` texts) is scored in one call in a
+worker thread, so the event loop keeps accepting connections meanwhile.
+Scoring goes through the same ``ModelHandle`` as the app (``clean_text``,
+fast scorer, score cache), so both give the same probability for a post. When more than ``--max-queue`` texts are
+waiting, new requests get ``503`` with ``Retry-After`` instead of queueing
+without bound.
+
+    python serve.py --port 8765
+    curl -s localhost:8765/score -d '{"text": "I feel so alone lately"}'
+
+Endpoints: ``POST /score`` (``{"text": ...}`` or ``{"texts": [...]}``),
+``GET /health``, ``GET /stats`` (JSON) and ``GET /metrics`` (Prometheus text).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+
+import numpy as np
+
+import metrics
+from model_service import get_model_handle
+
+HOST = "127.0.0.1"
+PORT = 8765
+BATCH_WINDOW_MS = 5.0
+MAX_BATCH = 256
+MAX_QUEUE = 2048
+MAX_BODY = 64 * 1024
+LATENCY_WINDOW = 10000
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+log = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    pass
+
+
+# ==========================
+# Micro-batching
+# ==========================
+class MicroBatcher:
+    def __init__(self, handle, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH, max_queue=MAX_QUEUE):
+        self.handle = handle
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self._queue = asyncio.Queue()
+        self._waiting = 0
+        self.batches = 0
+        self.texts = 0
+
+    async def score(self, texts):
+        """P(depressed) for ``texts``, scored together with whatever else is waiting."""
+        if self._waiting + len(texts) > self.max_queue:
+            raise Overloaded()
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in texts]
+        self._waiting += len(texts)
+        for text, future in zip(texts, futures):
+            self._queue.put_nowait((text, future))
+        return [await f for f in futures]
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._waiting -= len(batch)
+            texts = [text for text, _ in batch]
+            try:
+                with metrics.timer("serve_batch_seconds"):
+                    probs = await loop.run_in_executor(None, self.handle.predict_proba, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            metrics.inc("serve_batches_total")
+            self.batches += 1
+            self.texts += len(batch)
+            for (_, future), p in zip(batch, probs):
+                # The client may have disconnected and cancelled its wait
+                if not future.done():
+                    future.set_result(float(p))
+
+
+# ==========================
+# HTTP
+# ==========================
+class ScoringServer:
+    def __init__(self, batcher):
+        self.batcher = batcher
+        self.started = time.time()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.status_counts = {}
+
+    def stats(self):
+        window = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "responses": self.status_counts,
+            "queued": self.batcher._waiting,
+            "batches": self.batcher.batches,
+            "mean_batch_size": round(self.batcher.texts / max(self.batcher.batches, 1), 2),
+            "latency_ms": {
+                "window": len(self.latencies),
+                "p50": round(float(np.percentile(window, 50)), 3),
+                "p95": round(float(np.percentile(window, 95)), 3),
+                "p99": round(float(np.percentile(window, 99)), 3),
+                "max": round(float(window.max()), 3),
+            },
+        }
+
+    async def route(self, method, path, body):
+        if path == "/health":
+            return 200, {"status": "ok", "queued": self.batcher._waiting}
+        if path == "/stats":
+            return 200, self.stats()
+        if path == "/metrics":
+            return 200, metrics.to_prometheus()
+        if path != "/score":
+            return 404, {"error": "not found"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            payload = json.loads(body or b"{}")
+            if not isinstance(payload, dict):
+                raise TypeError
+            single = "texts" not in payload
+            texts = [payload["text"]] if single else payload["texts"]
+            # A bare string would otherwise be scored character by character
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise TypeError
+        except (ValueError, KeyError, TypeError):
+            return 400, {"error": 'expected {"text": "..."} or {"texts": ["...", ...]}'}
+        if len(texts) > self.batcher.max_queue:
+            return 413, {"error": f"at most {self.batcher.max_queue} texts per request"}
+        try:
+            probs = await self.batcher.score(texts)
+        except Overloaded:
+            return 503, {"error": "overloaded, retry shortly"}
+        except Exception:
+            # e.g. a broken artifact after a reload; the client still gets an answer
+            log.exception("Scoring failed")
+            return 500, {"error": "scoring failed"}
+        results = [{"probability": p, "prediction": int(p >= 0.5)} for p in probs]
+        return 200, results[0] if single else {"results": results}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                started = time.perf_counter()
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    status, result = 400, {"error": "invalid Content-Length"}
+                    keep_alive = False
+                elif length > MAX_BODY:
+                    status, result = 413, {"error": f"body over {MAX_BODY} bytes"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, result = await self.route(method, path.split("?")[0], body)
+                    keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                self._respond(writer, status, result, keep_alive)
+                await writer.drain()
+                elapsed = time.perf_counter() - started
+                self.status_counts[status] = self.status_counts.get(status, 0) + 1
+                if path.startswith("/score"):
+                    self.latencies.append(elapsed)
+                    metrics.observe("serve_request_seconds", elapsed, status=status)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _respond(self, writer, status, result, keep_alive):
+        if isinstance(result, str):
+            body, kind = result.encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            body, kind = json.dumps(result).encode("utf-8"), "application/json"
+        head = [
+            f"HTTP/1.1 {status} {REASONS[status]}",
+            f"Content-Type: {kind}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == 503:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+
+
+async def serve(host=HOST, port=PORT, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH, max_queue=MAX_QUEUE):
+    # Load and warm the model before listening, so the first requests don't wait for it
+    batcher = MicroBatcher(get_model_handle(), window_ms, max_batch, max_queue)
+    app = ScoringServer(batcher)
+    batch_task = asyncio.create_task(batcher.run())
+    server = await asyncio.start_server(app.handle, host, port, backlog=1024)
+    print(f"🚀 Scoring on http://{host}:{port} (window {window_ms}ms, max batch {max_batch}, max queue {max_queue})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batch_task.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP scoring service with request micro-batching.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--batch-window-ms", type=float, default=BATCH_WINDOW_MS,
+                        help="how long the first request of a batch waits for company")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-queue", type=int, default=MAX_QUEUE, help="texts waiting before new requests get 503")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.batch_window_ms, args.max_batch, args.max_queue))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,379 @@
+"""SQLite storage for moods and journal entries.
+
+Writes are single-row statements inside a transaction, so they cost the same
+no matter how long the history is, and a crash mid-write rolls back instead
+of truncating the data. Moods are keyed by date (upsert = one row per day);
+journal entries are indexed by timestamp.
+
+Data is partitioned per user: each user id gets its own database file, so
+one user's writes never wait on another's. Within a store, writes are
+serialized by an in-process lock and ``BEGIN IMMEDIATE`` (the read-modify-
+write in ``upsert_mood`` sees a stable row), reads run concurrently on
+pooled WAL connections.
+"""
+import csv
+import datetime as dt
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+
+import journal_index
+import mood_stats
+
+DATA_DIR = "data"
+DB_PATH = os.path.join(DATA_DIR, "wellness.db")
+USERS_DIR = os.path.join(DATA_DIR, "users")
+
+# The pre-partitioning single-user data (DB_PATH and the legacy CSVs) belongs to this user
+DEFAULT_USER = "Friend"
+
+POOL_SIZE = 4
+MAX_OPEN_STORES = 128
+
+# Pre-SQLite files, imported once on first open
+LEGACY_MOOD_CSV = os.path.join(DATA_DIR, "moods.csv")
+LEGACY_JOURNAL_CSV = os.path.join(DATA_DIR, "journal.csv")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS moods (
+    date TEXT PRIMARY KEY,
+    mood_score INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS journal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    title TEXT,
+    text TEXT,
+    risk_score REAL,
+    model_version TEXT
+);
+CREATE INDEX IF NOT EXISTS journal_timestamp ON journal (timestamp);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+BUMP_VERSION = (
+    "INSERT INTO meta (key, value) VALUES ('data_version', 1) "
+    "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+)
+
+UPSERT_MOOD = (
+    "INSERT INTO moods (date, mood_score) VALUES (?, ?) "
+    "ON CONFLICT (date) DO UPDATE SET mood_score = excluded.mood_score"
+)
+
+
+def user_id(display_name):
+    """Stable, filesystem-safe id for a display name (case and surrounding spaces ignored)."""
+    name = " ".join(str(display_name or "").split()).casefold() or DEFAULT_USER.casefold()
+    slug = re.sub(r"[^a-z0-9]+", "-", name).strip("-")[:32] or "user"
+    return f"{slug}-{hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]}"
+
+
+class ConnectionPool:
+    """Idle SQLite connections to one database, reused across threads."""
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        # WAL: readers don't block the writer, and commits are atomic appends
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def release(self, conn):
+        with self._lock:
+            if not self._closed and len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        """Close idle connections; connections still in use close when released."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class WellnessStore:
+    def __init__(self, path=DB_PATH, mood_csv=LEGACY_MOOD_CSV, journal_csv=LEGACY_JOURNAL_CSV):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._pool = ConnectionPool(path)
+        self._write_lock = threading.Lock()
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        # Persistent counter bumped by every write that changes rows; keys cached views and reports
+        self.version = 0
+        with self.transaction(write=True) as conn:
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(journal)")}
+            for column, kind in (("risk_score", "REAL"), ("model_version", "TEXT")):
+                if column not in columns:
+                    # Databases created before entries carried a persisted score
+                    conn.execute(f"ALTER TABLE journal ADD COLUMN {column} {kind}")
+            conn.execute("CREATE INDEX IF NOT EXISTS journal_model_version ON journal (model_version)")
+            conn.executescript(mood_stats.SCHEMA)
+            conn.executescript(journal_index.SCHEMA)
+        self.migrate_csv(mood_csv, journal_csv)
+        with self.transaction(write=True) as conn:
+            if not conn.execute("SELECT 1 FROM meta WHERE key = 'mood_stats_built'").fetchone():
+                mood_stats.rebuild(conn)
+                conn.execute("INSERT INTO meta (key, value) VALUES ('mood_stats_built', '1')")
+            if not conn.execute("SELECT 1 FROM meta WHERE key = 'journal_index_built'").fetchone():
+                journal_index.rebuild(conn)
+                conn.execute("INSERT INTO meta (key, value) VALUES ('journal_index_built', '1')")
+        with self.transaction() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+            self.version = int(row[0]) if row else 0
+
+    @contextmanager
+    def transaction(self, write=False):
+        """Pooled connection whose statements commit together, or roll back on error.
+
+        ``write=True`` takes the store's write lock and the database write lock
+        up front, so reads inside the block can't go stale before the write.
+        """
+        conn = self._pool.acquire()
+        try:
+            with self._write_lock if write else nullcontext():
+                with conn:
+                    if write:
+                        conn.execute("BEGIN IMMEDIATE")
+                        changes = conn.total_changes
+                    yield conn
+                    if write and conn.total_changes != changes:
+                        conn.execute(BUMP_VERSION)
+                        version = int(conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()[0])
+                    else:
+                        version = None
+                if version is not None:
+                    self.version = version
+        finally:
+            self._pool.release(conn)
+
+    def cached(self, key, build):
+        """``build()``, memoized until the next write to this store. Treat the result as read-only."""
+        version = self.version
+        with self._cache_lock:
+            hit = self._cache.get(key)
+        if hit is not None and hit[0] == version:
+            return hit[1]
+        value = build()
+        with self._cache_lock:
+            self._cache[key] = (version, value)
+        return value
+
+    def close(self):
+        self._pool.close()
+
+    # -------------------------
+    # Moods
+    # -------------------------
+    def upsert_mood(self, date_str, score):
+        with self.transaction(write=True) as conn:
+            old = conn.execute("SELECT mood_score FROM moods WHERE date = ?", (date_str,)).fetchone()
+            conn.execute(UPSERT_MOOD, (date_str, int(score)))
+            mood_stats.apply_mood_change(conn, date_str, old[0] if old else None, int(score))
+
+    def clear_moods(self):
+        with self.transaction(write=True) as conn:
+            conn.execute("DELETE FROM moods")
+            mood_stats.reset(conn)
+
+    def moods(self):
+        """All ``(date, mood_score)`` rows, oldest first."""
+        with self.transaction() as conn:
+            return conn.execute("SELECT date, mood_score FROM moods ORDER BY date").fetchall()
+
+    def iter_moods(self, batch_size=1000):
+        """Stream ``(date, mood_score)`` rows, oldest first, ``batch_size`` at a time."""
+        with self.transaction() as conn:
+            cur = conn.execute("SELECT date, mood_score FROM moods ORDER BY date")
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from rows
+
+    def mood_summary(self, today=None):
+        """7/30-entry averages, current/best logging streak and longest low-mood streak."""
+        with self.transaction() as conn:
+            return mood_stats.summary(conn, today)
+
+    def mood_periods(self, kind, limit=None):
+        """Weekly or monthly ``(period, average, count)`` rows, oldest first."""
+        with self.transaction() as conn:
+            return mood_stats.period_averages(conn, kind, limit)
+
+    # -------------------------
+    # Journal
+    # -------------------------
+    def add_journal(self, title, text, timestamp=None):
+        """Append a journal entry and return its id."""
+        ts = timestamp or dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.transaction(write=True) as conn:
+            cur = conn.execute(
+                "INSERT INTO journal (timestamp, title, text) VALUES (?, ?, ?)", (ts, title, text)
+            )
+            journal_index.index_entry(conn, cur.lastrowid, title, text)
+            return cur.lastrowid
+
+    def journal(self):
+        """All ``(timestamp, title, text, risk_score)`` rows in insertion order (score None until scored)."""
+        with self.transaction() as conn:
+            return conn.execute("SELECT timestamp, title, text, risk_score FROM journal ORDER BY id").fetchall()
+
+    def iter_journal(self, batch_size=1000):
+        """Stream ``(timestamp, title, text, risk_score)`` rows in insertion order, ``batch_size`` at a time."""
+        with self.transaction() as conn:
+            cur = conn.execute("SELECT timestamp, title, text, risk_score FROM journal ORDER BY id")
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from rows
+
+    def journal_page(self, page=1, page_size=20):
+        """One page of ``(timestamp, title, text, risk_score)`` rows, newest first, read through the timestamp index."""
+        with self.transaction() as conn:
+            return conn.execute(
+                "SELECT timestamp, title, text, risk_score FROM journal ORDER BY timestamp DESC, id DESC "
+                "LIMIT ? OFFSET ?",
+                (page_size, (max(page, 1) - 1) * page_size),
+            ).fetchall()
+
+    def journal_risk_series(self):
+        """``(timestamp, title, risk_score)`` of scored entries, oldest first; the entry text is left on disk."""
+        with self.transaction() as conn:
+            return conn.execute(
+                "SELECT timestamp, title, risk_score FROM journal WHERE risk_score IS NOT NULL ORDER BY timestamp, id"
+            ).fetchall()
+
+    def unscored_journal(self, model_version, limit=256):
+        """Up to ``limit`` ``(id, text)`` rows not yet scored by ``model_version``."""
+        with self.transaction() as conn:
+            return conn.execute(
+                "SELECT id, text FROM journal WHERE model_version IS NULL OR model_version != ? ORDER BY id LIMIT ?",
+                (model_version, limit),
+            ).fetchall()
+
+    def set_journal_scores(self, scores, model_version):
+        """Persist ``{entry_id: risk_score}`` as produced by ``model_version``."""
+        with self.transaction(write=True) as conn:
+            conn.executemany(
+                "UPDATE journal SET risk_score = ?, model_version = ? WHERE id = ?",
+                ((score, model_version, entry_id) for entry_id, score in scores.items()),
+            )
+
+    def journal_risk(self):
+        """``(average risk of scored entries or None, scored count, unscored count)``."""
+        with self.transaction() as conn:
+            return conn.execute(
+                "SELECT AVG(risk_score), COUNT(risk_score), COUNT(*) - COUNT(risk_score) FROM journal"
+            ).fetchone()
+
+    def search_journal(self, query, page=1, page_size=20):
+        """Ranked full-text search: ``(total_matches, [(timestamp, title, text), ...])`` for one page."""
+        with self.transaction() as conn:
+            total, hits = journal_index.search(conn, query, page, page_size)
+            rows = []
+            for entry_id, _ in hits:
+                rows.append(conn.execute(
+                    "SELECT timestamp, title, text FROM journal WHERE id = ?", (entry_id,)
+                ).fetchone())
+            return total, rows
+
+    def journal_count(self):
+        with self.transaction() as conn:
+            return conn.execute("SELECT COUNT(*) FROM journal").fetchone()[0]
+
+    # -------------------------
+    # Migration
+    # -------------------------
+    def migrate_csv(self, mood_csv, journal_csv):
+        """Import the legacy CSV files once; later opens are a single meta lookup."""
+        with self.transaction(write=True) as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'csv_migrated'").fetchone():
+                return
+            if os.path.exists(mood_csv):
+                with open(mood_csv, newline="", encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        try:
+                            date_str = dt.date.fromisoformat(str(row["date"])[:10]).isoformat()
+                            score = int(float(row["mood_score"]))
+                        except (KeyError, TypeError, ValueError):
+                            continue
+                        conn.execute(UPSERT_MOOD, (date_str, score))
+            if os.path.exists(journal_csv):
+                with open(journal_csv, newline="", encoding="utf-8") as f:
+                    conn.executemany(
+                        "INSERT INTO journal (timestamp, title, text) VALUES (?, ?, ?)",
+                        ((r.get("timestamp"), r.get("title"), r.get("text")) for r in csv.DictReader(f)
+                         if r.get("timestamp")),
+                    )
+            conn.execute("INSERT INTO meta (key, value) VALUES ('csv_migrated', ?)", (dt.datetime.now().isoformat(),))
+
+
+class StorePool:
+    """Process-wide ``user id -> WellnessStore`` map, keeping the most recent users open."""
+
+    def __init__(self, max_open=MAX_OPEN_STORES, users_dir=USERS_DIR, default_path=DB_PATH):
+        self.max_open = max_open
+        self.users_dir = users_dir
+        self.default_path = default_path
+        self._stores = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, uid):
+        with self._lock:
+            store = self._stores.get(uid)
+            if store is not None:
+                self._stores.move_to_end(uid)
+                return store
+            # Opening (schema check, one-off migration) is rare, so it's done under the lock:
+            # two sessions of a new user never race to create the same database
+            if uid == user_id(DEFAULT_USER):
+                store = WellnessStore(self.default_path)
+            else:
+                store = WellnessStore(os.path.join(self.users_dir, uid, "wellness.db"), mood_csv="", journal_csv="")
+            self._stores[uid] = store
+            while len(self._stores) > self.max_open:
+                _, evicted = self._stores.popitem(last=False)
+                evicted.close()
+            return store
+
+    def for_name(self, display_name):
+        return self.get(user_id(display_name))
+
+
+_store_pool = None
+_store_pool_lock = threading.Lock()
+
+
+def get_store_pool():
+    global _store_pool
+    with _store_pool_lock:
+        if _store_pool is None:
+            _store_pool = StorePool()
+        return _store_pool
@@ -0,0 +1,181 @@
+"""Parallel hyperparameter sweep with cross-validation for train.py.
+
+Each vectorizer config is fitted once per fold and written to the feature
+cache; every classifier config then trains in a worker process from those
+cached matrices instead of refitting the vectorizer. For every
+(vectorizer, classifier) pair we record CV accuracy, fit time, pickled model
+size and single-text inference latency, then retrain the chosen config on the
+full training split and save it as model.pkl / vectorizer.pkl.
+"""
+import argparse
+import csv
+import itertools
+import pickle
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold
+
+import dataset
+import train
+from feature_cache import FeatureCache, cache_key
+from parallel import bounded_map, default_workers
+
+RESULTS_PATH = "sweep_results.csv"
+FOLDS = 3
+LATENCY_SAMPLES = 200
+
+
+# ==========================
+# Phase 1: one featurization per vectorizer config
+# ==========================
+def _featurize(task):
+    path, vectorizer_params, folds = task
+    key = cache_key(path, {"kind": "cv-tfidf", "params": vectorizer_params, "folds": folds, "seed": train.SEED})
+    cache = FeatureCache(key)
+    if cache.complete:
+        return key
+
+    df = dataset.read_columns(dataset.resolve(path), dataset.COLUMNS)
+    df["clean_text"] = df["clean_text"].astype(str)
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=train.SEED)
+    cache.begin()
+    try:
+        for fold, (train_idx, test_idx) in enumerate(splitter.split(df["clean_text"], df["is_depression"])):
+            # Balance the training fold only, so duplicated rows never leak into the test fold
+            fold_train = train.upsample_minority(df.iloc[train_idx])
+            fold_test = df.iloc[test_idx]
+            vectorizer = TfidfVectorizer(**vectorizer_params)
+            cache.add_matrix(f"X_train_{fold}", vectorizer.fit_transform(fold_train["clean_text"]))
+            cache.add_matrix(f"X_test_{fold}", vectorizer.transform(fold_test["clean_text"]))
+            cache.add_array(f"y_train_{fold}", fold_train["is_depression"])
+            cache.add_array(f"y_test_{fold}", fold_test["is_depression"])
+            cache.add_object(f"vectorizer_{fold}", vectorizer)
+        cache.commit()
+    except BaseException:
+        cache.abort()
+        raise
+    return key
+
+
+# ==========================
+# Phase 2: classifiers trained from the cached matrices
+# ==========================
+def _evaluate(task):
+    key, classifier_params, folds = task
+    cache = FeatureCache(key)
+    accuracies, fit_times = [], []
+    model = None
+    for fold in range(folds):
+        X_train, y_train = cache.load_matrix(f"X_train_{fold}"), cache.load_array(f"y_train_{fold}")
+        X_test, y_test = cache.load_matrix(f"X_test_{fold}"), cache.load_array(f"y_test_{fold}")
+        started = time.perf_counter()
+        fold_model = LogisticRegression(**classifier_params).fit(X_train, y_train)
+        fit_times.append(time.perf_counter() - started)
+        accuracies.append(float((fold_model.predict(X_test) == y_test).mean()))
+        if fold == 0:
+            model = fold_model
+    # The fold-0 model goes back to the parent, which times inference serially
+    return {
+        "accuracy": float(np.mean(accuracies)),
+        "accuracy_std": float(np.std(accuracies)),
+        "fit_s": float(np.mean(fit_times)),
+        "model": pickle.dumps(model),
+    }
+
+
+def _single_text_latency_ms(model, vectorizer, texts):
+    timings = []
+    for text in texts:
+        started = time.perf_counter()
+        model.predict_proba(vectorizer.transform([text]))
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings) * 1000)
+
+
+def run_sweep(path, vectorizer_grid, classifier_grid, folds=FOLDS, workers=None):
+    """Evaluate every (vectorizer, classifier) pair; returns one result dict per pair."""
+    started = time.perf_counter()
+    keys = list(bounded_map(_featurize, [(path, v, folds) for v in vectorizer_grid], workers=workers))
+    print(f"Featurized {len(vectorizer_grid)} vectorizer configs x {folds} folds "
+          f"({time.perf_counter() - started:.1f}s)")
+
+    pairs = list(itertools.product(range(len(vectorizer_grid)), classifier_grid))
+    tasks = [(keys[v], c, folds) for v, c in pairs]
+    first = next(dataset.iter_batches(dataset.resolve(path), ["clean_text"], LATENCY_SAMPLES))
+    sample = first["clean_text"].astype(str).tolist()
+
+    results = []
+    for (v, classifier_params), scores in zip(pairs, bounded_map(_evaluate, tasks, workers=workers)):
+        vectorizer = FeatureCache(keys[v]).load_object("vectorizer_0")
+        model = pickle.loads(scores.pop("model"))
+        results.append({
+            "vectorizer": vectorizer_grid[v],
+            "classifier": classifier_params,
+            **scores,
+            "size_kb": (len(pickle.dumps(model)) + len(pickle.dumps(vectorizer))) / 1024,
+            "latency_ms": _single_text_latency_ms(model, vectorizer, sample),
+        })
+        r = results[-1]
+        print(f"  acc={r['accuracy']:.4f}±{r['accuracy_std']:.4f} fit={r['fit_s']:.2f}s "
+              f"size={r['size_kb']:.0f}KB latency={r['latency_ms']:.3f}ms  {r['vectorizer']} {r['classifier']}")
+    print(f"Sweep finished in {time.perf_counter() - started:.1f}s")
+    return results
+
+
+def pick_best(results, max_latency_ms=None, max_size_kb=None):
+    """Most accurate config within the latency/size budget (ties: faster first)."""
+    eligible = [
+        r for r in results
+        if (max_latency_ms is None or r["latency_ms"] <= max_latency_ms)
+        and (max_size_kb is None or r["size_kb"] <= max_size_kb)
+    ]
+    if not eligible:
+        return None
+    return max(eligible, key=lambda r: (round(r["accuracy"], 4), -r["latency_ms"]))
+
+
+def write_results(results, path=RESULTS_PATH):
+    fields = ["accuracy", "accuracy_std", "fit_s", "size_kb", "latency_ms", "vectorizer", "classifier"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for r in sorted(results, key=lambda r: -r["accuracy"]):
+            writer.writerow({k: r[k] for k in fields})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross-validated hyperparameter sweep for the depression classifier.")
+    parser.add_argument("--data", default=train.default_data())
+    parser.add_argument("--max-features", type=int, nargs="+", default=[2000, 5000, 20000])
+    parser.add_argument("--ngram-max", type=int, nargs="+", default=[1, 2], help="upper n-gram sizes to try")
+    parser.add_argument("--sublinear-tf", choices=["yes", "no", "both"], default="both")
+    parser.add_argument("--C", type=float, nargs="+", default=[0.3, 1.0, 3.0], help="inverse regularization strengths")
+    parser.add_argument("--folds", type=int, default=FOLDS)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--max-latency-ms", type=float, help="only export configs at or under this latency")
+    parser.add_argument("--max-size-kb", type=float, help="only export configs at or under this size")
+    parser.add_argument("--no-export", action="store_true", help="record results without replacing model.pkl")
+    args = parser.parse_args()
+
+    sublinear = {"yes": [True], "no": [False], "both": [False, True]}[args.sublinear_tf]
+    vectorizer_grid = [
+        {"stop_words": "english", "max_features": m, "ngram_range": (1, n), "sublinear_tf": s}
+        for m, n, s in itertools.product(args.max_features, args.ngram_max, sublinear)
+    ]
+    classifier_grid = [{"C": c, "max_iter": 1000} for c in args.C]
+
+    results = run_sweep(args.data, vectorizer_grid, classifier_grid, args.folds, args.workers)
+    write_results(results)
+    print(f"📄 Results saved at: {RESULTS_PATH}")
+
+    best = pick_best(results, args.max_latency_ms, args.max_size_kb)
+    if best is None:
+        print("❌ No config fits the latency/size budget; model.pkl left unchanged")
+    else:
+        print(f"🏆 Best: acc={best['accuracy']:.4f} latency={best['latency_ms']:.3f}ms "
+              f"{best['vectorizer']} {best['classifier']}")
+        if not args.no_export:
+            train.train_in_memory(args.data, vectorizer_params=best["vectorizer"], classifier_params=best["classifier"])
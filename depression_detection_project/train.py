@@ -1,63 +1,259 @@
-# train.py
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report
-from sklearn.utils import resample
-import pickle
-
-# ==========================
-# Load Dataset
-# ==========================
-df = pd.read_csv("dataset/depression_dataset_reddit_cleaned.csv")
-
-print("Before balancing:\n", df["is_depression"].value_counts())
-
-# Balance dataset (upsample minority)
-df_majority = df[df.is_depression == 0]
-df_minority = df[df.is_depression == 1]
-
-df_minority_upsampled = resample(df_minority,
-                                 replace=True,
-                                 n_samples=len(df_majority),
-                                 random_state=42)
-
-df_balanced = pd.concat([df_majority, df_minority_upsampled])
-
-print("After balancing:\n", df_balanced["is_depression"].value_counts())
-
-# ==========================
-# Train-Test Split
-# ==========================
-X_train, X_test, y_train, y_test = train_test_split(
-    df_balanced["clean_text"], df_balanced["is_depression"],
-    test_size=0.2, random_state=42
-)
-
-# ==========================
-# Vectorizer + Model
-# ==========================
-vectorizer = TfidfVectorizer(stop_words="english", max_features=5000)
-X_train_tfidf = vectorizer.fit_transform(X_train)
-X_test_tfidf = vectorizer.transform(X_test)
-
-model = LogisticRegression(max_iter=200)
-model.fit(X_train_tfidf, y_train)
-
-# ==========================
-# Evaluation
-# ==========================
-y_pred = model.predict(X_test_tfidf)
-print("\nClassification Report:\n", classification_report(y_test, y_pred))
-
-# ==========================
-# Save Model + Vectorizer
-# ==========================
-with open("model.pkl", "wb") as f:
-    pickle.dump(model, f)
-
-with open("vectorizer.pkl", "wb") as f:
-    pickle.dump(vectorizer, f)
-
-print("✅ Model and vectorizer saved!")
+# train.py
+import argparse
+import os
+import pickle
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import classification_report
+from sklearn.utils import resample
+
+import dataset
+from fast_scorer import FAST_MODEL_PATH, export_fast_model
+from feature_cache import CACHE_DIR, FeatureCache, cache_key
+
+RAW_PATH = "dataset/depression_dataset_reddit_cleaned.csv"
+PROCESSED_PATH = "dataset/processed_depression.csv"
+MODEL_PATH = "model.pkl"
+VECTORIZER_PATH = "vectorizer.pkl"
+
+TFIDF_PARAMS = {"stop_words": "english", "max_features": 5000}
+CLASSIFIER_PARAMS = {"max_iter": 200}
+HASHING_PARAMS = {"stop_words": "english", "n_features": 2 ** 20, "alternate_sign": False}
+TEST_SIZE = 0.2
+SEED = 42
+
+
+# ==========================
+# Load Dataset
+# ==========================
+def upsample_minority(df):
+    """Duplicate random minority-class rows until both classes are the same size."""
+    counts = df["is_depression"].value_counts()
+    if counts.nunique() == 1:
+        # Already balanced (idxmax and idxmin would name the same class)
+        return df
+    minority = counts.idxmin()
+    df_majority = df[df.is_depression == counts.drop(minority).idxmax()]
+    df_minority = df[df.is_depression == minority]
+
+    df_minority_upsampled = resample(df_minority,
+                                     replace=True,
+                                     n_samples=len(df_majority),
+                                     random_state=SEED)
+
+    return pd.concat([df_majority, df_minority_upsampled])
+
+
+def default_data():
+    """The deduplicated output of preprocess.py when it exists, else the raw CSV."""
+    return PROCESSED_PATH if os.path.exists(PROCESSED_PATH) else RAW_PATH
+
+
+def load_split(path=RAW_PATH):
+    """Stratified train/test frames; only the training frame is balanced.
+
+    Upsampling after the split keeps copies of a training row out of the
+    test set, so the report measures unseen posts.
+    """
+    df = dataset.read_columns(dataset.resolve(path), dataset.COLUMNS)
+
+    print("Before balancing:\n", df["is_depression"].value_counts())
+
+    # Train-Test Split
+    df_train, df_test = train_test_split(df, test_size=TEST_SIZE, random_state=SEED, stratify=df["is_depression"])
+
+    # Balance the training split (upsample minority)
+    df_train = upsample_minority(df_train)
+
+    print("After balancing (train split):\n", df_train["is_depression"].value_counts())
+    return df_train, df_test
+
+
+# ==========================
+# Vectorizer (cached)
+# ==========================
+def tfidf_features(path=RAW_PATH, params=TFIDF_PARAMS, use_cache=True):
+    """Fitted vectorizer and train/test TF-IDF matrices, from the feature cache when possible."""
+    cache = FeatureCache(cache_key(path, {"kind": "tfidf", "params": params, "test_size": TEST_SIZE, "seed": SEED,
+                                          "balance": "train-split"}))
+    if use_cache and cache.complete:
+        print(f"⚡ Using cached features: {cache.path}")
+        return (cache.load_object("vectorizer"), cache.load_matrix("X_train"), cache.load_matrix("X_test"),
+                cache.load_array("y_train"), cache.load_array("y_test"))
+
+    df_train, df_test = load_split(path)
+    X_train, y_train = df_train["clean_text"].astype(str), df_train["is_depression"]
+    X_test, y_test = df_test["clean_text"].astype(str), df_test["is_depression"]
+
+    vectorizer = TfidfVectorizer(**params)
+    X_train_tfidf = vectorizer.fit_transform(X_train)
+    X_test_tfidf = vectorizer.transform(X_test)
+
+    if use_cache:
+        cache.begin()
+        try:
+            cache.add_object("vectorizer", vectorizer)
+            cache.add_matrix("X_train", X_train_tfidf)
+            cache.add_matrix("X_test", X_test_tfidf)
+            cache.add_array("y_train", y_train)
+            cache.add_array("y_test", y_test)
+            cache.commit()
+        except BaseException:
+            cache.abort()
+            raise
+    return vectorizer, X_train_tfidf, X_test_tfidf, np.asarray(y_train), np.asarray(y_test)
+
+
+# ==========================
+# Save Model + Vectorizer
+# ==========================
+def save_model(model, vectorizer):
+    with open(MODEL_PATH, "wb") as f:
+        pickle.dump(model, f)
+
+    with open(VECTORIZER_PATH, "wb") as f:
+        pickle.dump(vectorizer, f)
+
+    # Folded, sklearn-free copy for low-latency serving
+    try:
+        export_fast_model(model, vectorizer, FAST_MODEL_PATH)
+    except ValueError as e:
+        # e.g. hashing features have no vocabulary to fold; don't leave a stale artifact behind
+        if os.path.exists(FAST_MODEL_PATH):
+            os.remove(FAST_MODEL_PATH)
+        print(f"ℹ️ No fast model exported: {e}")
+
+    print("✅ Model and vectorizer saved!")
+
+
+def train_in_memory(path=RAW_PATH, use_cache=True, vectorizer_params=TFIDF_PARAMS, classifier_params=CLASSIFIER_PARAMS):
+    vectorizer, X_train_tfidf, X_test_tfidf, y_train, y_test = tfidf_features(path, vectorizer_params, use_cache)
+
+    model = LogisticRegression(**classifier_params)
+    model.fit(X_train_tfidf, y_train)
+
+    # Evaluation
+    y_pred = model.predict(X_test_tfidf)
+    print("\nClassification Report:\n", classification_report(y_test, y_pred))
+
+    save_model(model, vectorizer)
+
+
+# ==========================
+# Out-of-core training
+# ==========================
+def _read_batches(path, batch_size):
+    for chunk in dataset.iter_batches(dataset.resolve(path), dataset.COLUMNS, batch_size):
+        yield chunk["clean_text"].astype(str), chunk["is_depression"].to_numpy()
+
+
+def hashed_feature_cache(path, vectorizer, batch_size, root=CACHE_DIR):
+    """Feature cache under ``root`` holding ``path`` hashed batch by batch; featurizes only on a cache miss."""
+    params = {k: v for k, v in vectorizer.get_params().items() if k != "dtype"}
+    cache = FeatureCache(cache_key(path, {"kind": "hashing", "params": params, "batch_size": batch_size}), root)
+    if cache.complete:
+        print(f"⚡ Using cached features: {cache.path}")
+        return cache
+
+    cache.begin()
+    try:
+        for texts, y in _read_batches(path, batch_size):
+            cache.add_batch(vectorizer.transform(texts), y)
+        cache.commit()
+    except BaseException:
+        cache.abort()
+        raise
+    return cache
+
+
+def _holdout_mask(batch_no, n):
+    # Deterministic per batch, so every epoch (and every run) holds out the same rows
+    return np.random.default_rng(SEED + batch_no).random(n) < TEST_SIZE
+
+
+def _fit_batches(model, cache, epochs, mix, started):
+    """Weighted, shuffled ``partial_fit`` epochs over the cached batches, then a held-out report."""
+    classes = np.array([0, 1])
+    n_batches = cache.batch_count()
+    counts = np.zeros(2)
+    for batch_no in range(n_batches):
+        y = cache.load_array(f"y_{batch_no:05d}")
+        counts += np.bincount(y[~_holdout_mask(batch_no, len(y))], minlength=2)
+    # "balanced" weighting: n_samples / (n_classes * n_class_samples)
+    class_weight = counts.sum() / (2 * np.maximum(counts, 1))
+    print(f"Class counts: {counts.astype(int).tolist()} -> weights {np.round(class_weight, 3).tolist()}")
+
+    rng = np.random.default_rng(SEED)
+    for epoch in range(epochs):
+        order = rng.permutation(n_batches)
+        for i in range(0, n_batches, mix):
+            Xs, ys = [], []
+            for batch_no in order[i:i + mix]:
+                X, y = cache.load_batch(batch_no)
+                train = ~_holdout_mask(batch_no, len(y))
+                Xs.append(X[train])
+                ys.append(y[train])
+            X, y = sp.vstack(Xs).tocsr(), np.concatenate(ys)
+            perm = rng.permutation(len(y))
+            model.partial_fit(X[perm], y[perm], classes=classes, sample_weight=class_weight[y[perm]])
+        print(f"  epoch {epoch + 1}/{epochs} done ({time.perf_counter() - started:.1f}s)")
+
+    # Evaluation on the held-out rows
+    y_test, y_pred = [], []
+    for batch_no in range(n_batches):
+        X, y = cache.load_batch(batch_no)
+        test = _holdout_mask(batch_no, len(y))
+        y_test.append(y[test])
+        y_pred.append(model.predict(X[test]))
+    print("\nClassification Report:\n", classification_report(np.concatenate(y_test), np.concatenate(y_pred)))
+    return model
+
+
+def train_out_of_core(path=PROCESSED_PATH, batch_size=10000, epochs=5, mix=4, use_cache=True):
+    """Stream ``path`` in batches through a HashingVectorizer and an incremental SGD classifier.
+
+    Class imbalance is handled with per-sample weights instead of duplicating
+    minority rows. Each step shuffles ``mix`` randomly chosen batches together,
+    so files sorted by label still give mixed updates while memory stays at
+    ``mix * batch_size`` rows. Without ``use_cache`` the hashed batches go to
+    a scratch directory that is removed afterwards, so the shared feature
+    cache is neither read nor written.
+    """
+    vectorizer = HashingVectorizer(**HASHING_PARAMS)
+    model = SGDClassifier(loss="log_loss", alpha=1e-5, random_state=SEED)
+
+    started = time.perf_counter()
+    scratch = None if use_cache else tempfile.mkdtemp(prefix="wellness-features-")
+    try:
+        cache = hashed_feature_cache(path, vectorizer, batch_size, scratch or CACHE_DIR)
+        print(f"{cache.batch_count()} feature batches ready ({time.perf_counter() - started:.1f}s)")
+        _fit_batches(model, cache, epochs, mix, started)
+    finally:
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    save_model(model, vectorizer)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the depression classifier.")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="stream the processed dataset in batches (hashing features + SGD)")
+    parser.add_argument("--data", help=f"training CSV (default: {PROCESSED_PATH} if preprocess.py has run, else {RAW_PATH})")
+    parser.add_argument("--batch-size", type=int, default=10000, help="rows per batch for --out-of-core")
+    parser.add_argument("--epochs", type=int, default=5, help="passes over the data for --out-of-core")
+    parser.add_argument("--no-cache", action="store_true", help="featurize from scratch without reading or writing the feature cache")
+    args = parser.parse_args()
+
+    if args.out_of_core:
+        train_out_of_core(args.data or PROCESSED_PATH, args.batch_size, args.epochs, use_cache=not args.no_cache)
+    else:
+        train_in_memory(args.data or default_data(), use_cache=not args.no_cache)
@@ -0,0 +1,66 @@
+"""Streamlit-free views over a ``WellnessStore`` used by the app pages.
+
+Kept out of app.py so they can be imported (and benchmarked) without
+starting a Streamlit script run. pandas is only imported by the views that
+build DataFrames, so the summary helpers stay cheap to import.
+"""
+from __future__ import annotations
+
+import datetime as dt
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def load_moods(store) -> pd.DataFrame:
+    import pandas as pd
+
+    df = pd.DataFrame(store.moods(), columns=["date", "mood_score"])
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    return df.dropna(subset=["date"])
+
+
+def load_journal(store) -> pd.DataFrame:
+    import pandas as pd
+
+    return pd.DataFrame(store.journal(), columns=["timestamp", "title", "text", "risk_score"])
+
+
+def load_journal_page(store, page=1, page_size=20) -> pd.DataFrame:
+    import pandas as pd
+
+    return pd.DataFrame(store.journal_page(page, page_size), columns=["timestamp", "title", "text", "risk_score"])
+
+
+def load_journal_risk(store) -> pd.DataFrame:
+    import pandas as pd
+
+    return pd.DataFrame(store.journal_risk_series(), columns=["timestamp", "title", "risk_score"])
+
+
+def fmt_avg(value) -> str:
+    return f"{value:.2f}" if value is not None else "—"
+
+
+def summary_body(store) -> str:
+    """The summary without its timestamp; it only changes with the data or the date."""
+    stats = store.mood_summary()
+    best = stats["best_streak"]
+    avg_risk, scored, unscored = store.journal_risk()
+    lines = [
+        f"7-day avg mood (1-5): {fmt_avg(stats['avg7'])}",
+        f"30-day avg mood (1-5): {fmt_avg(stats['avg30'])}",
+        f"Current logging streak: {stats['streak']} day(s)",
+        f"Best logging streak: {best['days'] if best else 0} day(s)",
+        f"Journal entries: {store.journal_count()}",
+        f"Average journal risk: {f'{avg_risk:.1f}%' if avg_risk is not None else '—'} ({scored} scored"
+        + (f", {unscored} pending)" if unscored else ")"),
+    ]
+    return "\n".join(lines)
+
+
+def summary_text(store, body=None) -> str:
+    """``summary_body`` (or a precomputed ``body``) under the current time."""
+    body = summary_body(store) if body is None else body
+    return f"Report generated: {dt.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n{body}"